@@ -0,0 +1,80 @@
+"""Microbenchmark for the on_message keyword engine.
+
+Builds a rule table with a few hundred triggers and reports messages/sec for
+the compiled single-pass engine next to the old "chain of `in` checks" style.
+
+    python benchmarks/bench_keywords.py [--rules 300] [--messages 20000]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keywords import KeywordEngine, Rule  # noqa: E402
+
+
+def random_word(rng, lo=3, hi=10):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(lo, hi)))
+
+
+def build_rules(rng, count):
+    rules = []
+    for i in range(count):
+        words = [random_word(rng) for _ in range(rng.randint(1, 2))]
+        rules.append(Rule(i, (" ".join(words),), rng.choice(("reply", "react")), "ok"))
+    return rules
+
+
+def build_messages(rng, rules, count, hit_rate):
+    messages = []
+    for _ in range(count):
+        words = [random_word(rng, 2, 8) for _ in range(rng.randint(3, 25))]
+        if rng.random() < hit_rate:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(rules).triggers[0])
+        text = " ".join(words)
+        messages.append(text.title() if rng.random() < 0.3 else text)
+    return messages
+
+
+def naive_match(rules, text):
+    content = text.lower()
+    return [r for r in rules if any(t in content for t in r.triggers)]
+
+
+def bench(label, fn, messages, repeat):
+    best = float("inf")
+    hits = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hits = sum(1 for m in messages if fn(m))
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<10} {len(messages) / best:>12,.0f} msg/s   ({hits} messages matched)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rules", type=int, default=300)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--hit-rate", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rules = build_rules(rng, args.rules)
+    messages = build_messages(rng, rules, args.messages, args.hit_rate)
+
+    start = time.perf_counter()
+    engine = KeywordEngine(rules)
+    print(f"{args.rules} rules compiled in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    bench("engine", engine.match, messages, args.repeat)
+    bench("naive", lambda m: naive_match(rules, m), messages, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Memory cost of each MEMBER_CACHE policy.
+
+Loads the bot against the offline fakes (see loadtest.py), feeds it
+GUILD_CREATE payloads carrying every member (what chunking delivers in
+"full" mode), lets a slice of each guild chat, and reports the RSS growth
+per guild. Each policy runs in its own process so the numbers don't bleed
+into each other.
+
+    python benchmarks/bench_members.py [--guilds 50] [--members 1000] [--active 100]
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+MODES = ("full", "recent", "none")
+FIRST_GUILD_ID = 700000000000000000
+
+
+def rss_bytes():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+async def measure(args):
+    import discord
+    import loadtest
+    from fakes import channel_payload, guild_payload, member_payload, message_payload, user_payload
+
+    harness = loadtest.Harness(argparse.Namespace(
+        channels=1, members=2, seed=1, jitter=0.0, discord_latency=0.0, upstream_latency=0.0, error_rate=0.0,
+    ))
+    await harness.start()
+    main = harness.main
+    try:
+        gc.collect()
+        before = rss_bytes()
+        for g in range(args.guilds):
+            guild_id = FIRST_GUILD_ID + g * 100000
+            channel_id = guild_id + 1
+            users = [user_payload(guild_id + 10 + i, f"m{g}-{i}") for i in range(args.members)]
+            members = [member_payload(u) for u in users] + [member_payload(harness.discord.bot_user)]
+            guild = main.bot._connection._add_guild_from_data(
+                guild_payload(guild_id, [channel_payload(channel_id, guild_id, "chat")], members, [])
+            )
+            channel = guild.get_channel(channel_id)
+            for author in harness.rng.sample(users, min(args.active, len(users))):
+                data = message_payload(harness.rng.getrandbits(60), channel_id, guild_id, author, "gg")
+                await main.on_message(discord.Message(state=main.bot._connection, channel=channel, data=data))
+        gc.collect()
+        grown = rss_bytes() - before
+        return {
+            "mode": main.MEMBER_CACHE,
+            "cached": sum(len(g.members) for g in main.bot.guilds),
+            "lru": len(main.member_lru.members),
+            "rss": grown,
+        }
+    finally:
+        await harness.stop()
+
+
+def run_child(mode, args):
+    env = dict(os.environ, MEMBER_CACHE=mode)
+    cmd = [sys.executable, __file__, "--child",
+           "--guilds", str(args.guilds), "--members", str(args.members), "--active", str(args.active)]
+    out = subprocess.run(cmd, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modes", nargs="*", metavar="mode", help=f"any of: {', '.join(MODES)} (default: all)")
+    parser.add_argument("--guilds", type=int, default=50)
+    parser.add_argument("--members", type=int, default=1000, help="members per guild")
+    parser.add_argument("--active", type=int, default=100, help="members per guild who send a message")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(measure(args))))
+        return
+
+    unknown = [m for m in args.modes if m not in MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+
+    print(f"{args.guilds} guilds x {args.members} members, {args.active} active per guild")
+    print(f"{'mode':<8} {'cached':>9} {'lru':>7} {'rss growth':>11} {'per guild':>10}")
+    for mode in args.modes or MODES:
+        row = run_child(mode, args)
+        print(
+            f"{row['mode']:<8} {row['cached']:>9} {row['lru']:>7} "
+            f"{row['rss'] / 2**20:>9.1f}MB {row['rss'] / args.guilds / 1024:>8.1f}KB"
+        )
+
+
+if __name__ == "__main__":
+    main()
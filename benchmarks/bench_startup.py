@@ -0,0 +1,137 @@
+"""Startup cost of the extension loading modes.
+
+Starts the real bot against the offline fakes, gateway included (see
+fakes.py), and reports how long `import main` takes, how long setup_hook
+spends (that's where extensions are loaded), the time from bot.start() to
+on_ready, how many commands were registered by then, and the process RSS.
+Each mode runs in fresh processes so imports are never already cached.
+
+    python benchmarks/bench_startup.py [eager lazy core] [--guilds 20] [--repeat 3]
+
+eager loads every extension at startup, lazy only the ones with background
+work (the rest load on first use), core loads none.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+MODES = {
+    "eager": {"LAZY_EXTENSIONS": "0"},
+    "lazy": {"LAZY_EXTENSIONS": "1"},
+    "core": {"LIL_EXTENSIONS": ""},
+}
+
+
+def rss_bytes():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+async def measure(args):
+    from fakes import FakeDiscord, FakeGateway, FakeVlr
+
+    gateway = await FakeGateway(guilds=args.guilds, members=args.members).start()
+    servers = [await FakeDiscord().start(), await FakeVlr().start(), gateway]
+    workdir = tempfile.mkdtemp(prefix="lil-startup-")
+    os.environ.update({
+        "DISCORD_TOKEN": "startup-bench",
+        "VLR_API_BASE": servers[1].url,
+        "LIL_DB_PATH": os.path.join(workdir, "lil.db"),
+        "LOG_FILE": os.path.join(workdir, "discord.log"),
+        "PORT": "0",
+        "GUILD_READY_TIMEOUT": str(args.guild_ready_timeout),
+    })
+    os.chdir(workdir)
+
+    started = time.perf_counter()
+    import main
+    import_seconds = time.perf_counter() - started
+
+    import discord
+    import yarl
+
+    discord.http.Route.BASE = f"{servers[0].url}/api/v10"
+    discord.gateway.DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(gateway.url.replace("http", "ws", 1) + "/")
+
+    bot = main.bot
+    setup_hook = bot.setup_hook
+    setup = {}
+
+    async def timed_setup_hook():
+        setup_started = time.perf_counter()
+        await setup_hook()
+        setup["seconds"] = time.perf_counter() - setup_started
+
+    bot.setup_hook = timed_setup_hook
+    started = time.perf_counter()
+    runner = asyncio.create_task(bot.start("startup-bench"))
+    await asyncio.wait_for(bot.wait_until_ready(), 60)
+    ready_seconds = time.perf_counter() - started
+    result = {
+        "import": import_seconds,
+        "setup": setup["seconds"],
+        "ready": ready_seconds,
+        "guilds": len(bot.guilds),
+        "commands": len(bot.all_commands),
+        "extensions": len(bot.extensions),
+        "rss": rss_bytes(),
+    }
+    await bot.close()
+    await asyncio.gather(runner, return_exceptions=True)
+    for server in servers:
+        await server.stop()
+    return result
+
+
+def run_child(mode, args):
+    env = {k: v for k, v in os.environ.items() if k not in ("LIL_EXTENSIONS", "LAZY_EXTENSIONS")}
+    env.update(MODES[mode])
+    cmd = [sys.executable, __file__, "--child", "--guilds", str(args.guilds), "--members", str(args.members),
+           "--guild-ready-timeout", str(args.guild_ready_timeout)]
+    out = subprocess.run(cmd, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modes", nargs="*", metavar="mode", help=f"any of: {', '.join(MODES)} (default: all)")
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--members", type=int, default=50, help="members per guild")
+    parser.add_argument("--guild-ready-timeout", type=float, default=0.1,
+                        help="seconds discord.py waits for more guilds before on_ready (its default is 2)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per mode; the fastest is shown")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(measure(args))))
+        return
+
+    unknown = [m for m in args.modes if m not in MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+
+    print(f"{args.guilds} guilds x {args.members} members, guild_ready_timeout {args.guild_ready_timeout:g}s")
+    print(f"{'mode':<6} {'import':>9} {'setup':>9} {'ready':>9} {'commands':>9} {'exts':>5} {'rss':>8}")
+    for mode in args.modes or MODES:
+        row = min((run_child(mode, args) for _ in range(args.repeat)), key=lambda r: r["ready"])
+        print(
+            f"{mode:<6} {row['import'] * 1000:>7.0f}ms {row['setup'] * 1000:>7.0f}ms {row['ready'] * 1000:>7.0f}ms "
+            f"{row['commands']:>9} {row['extensions']:>5} {row['rss'] / 2**20:>6.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""Local stand-ins for Discord's REST API and gateway, Giphy and vlrggapi.
+
+Each fake is a small aiohttp app bound to 127.0.0.1 on a random port, with
+configurable response latency (and, for the upstream APIs, error rate). They
+count every request so a benchmark can report how much traffic the bot
+generated. Nothing here touches the network.
+"""
+import asyncio
+import datetime
+import itertools
+import json
+import random
+from collections import Counter
+
+from aiohttp import web
+
+BOT_USER_ID = 900000000000000001
+APPLICATION_ID = 900000000000000002
+OWNER_ID = 900000000000000003
+
+_snowflakes = itertools.count(1100000000000000000)
+
+
+def snowflake():
+    return str(next(_snowflakes))
+
+
+def now_iso():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def user_payload(user_id, name, bot=False):
+    return {
+        "id": str(user_id),
+        "username": name,
+        "global_name": name,
+        "discriminator": "0",
+        "avatar": None,
+        "bot": bot,
+        "public_flags": 0,
+    }
+
+
+def member_payload(user, role_ids=()):
+    return {
+        "user": user,
+        "roles": [str(r) for r in role_ids],
+        "joined_at": now_iso(),
+        "premium_since": None,
+        "deaf": False,
+        "mute": False,
+        "flags": 0,
+        "pending": False,
+    }
+
+
+def channel_payload(channel_id, guild_id, name):
+    return {
+        "id": str(channel_id),
+        "type": 0,
+        "guild_id": str(guild_id),
+        "name": name,
+        "position": 0,
+        "permission_overwrites": [],
+        "nsfw": False,
+        "parent_id": None,
+        "topic": None,
+        "last_message_id": None,
+        "rate_limit_per_user": 0,
+    }
+
+
+def role_payload(role_id, name, position):
+    return {
+        "id": str(role_id),
+        "name": name,
+        "color": 0,
+        "hoist": False,
+        "position": position,
+        "permissions": "0",
+        "managed": False,
+        "mentionable": False,
+        "flags": 0,
+    }
+
+
+def guild_payload(guild_id, channels, members, roles):
+    return {
+        "id": str(guild_id),
+        "name": "Load Test Guild",
+        "icon": None,
+        "owner_id": str(OWNER_ID),
+        "member_count": len(members),
+        "large": len(members) > 250,
+        "roles": [role_payload(guild_id, "@everyone", 0)] + roles,
+        "emojis": [],
+        "stickers": [],
+        "features": [],
+        "channels": channels,
+        "system_channel_id": channels[0]["id"] if channels else None,
+        "members": members,
+        "threads": [],
+        "voice_states": [],
+        "presences": [],
+        "premium_tier": 0,
+        "verification_level": 0,
+        "default_message_notifications": 0,
+        "explicit_content_filter": 0,
+        "mfa_level": 0,
+        "nsfw_level": 0,
+        "preferred_locale": "en-US",
+    }
+
+
+def message_payload(message_id, channel_id, guild_id, author, content, mentions=(), embeds=()):
+    data = {
+        "id": str(message_id),
+        "channel_id": str(channel_id),
+        "author": author,
+        "content": content,
+        "timestamp": now_iso(),
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": list(mentions),
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": list(embeds),
+        "pinned": False,
+        "type": 0,
+        "flags": 0,
+    }
+    if guild_id:
+        # Gateway MESSAGE_CREATE carries these; REST responses do not.
+        data["guild_id"] = str(guild_id)
+        data["member"] = {k: v for k, v in member_payload(author).items() if k != "user"}
+    return data
+
+
+def json_response(data, status=200):
+    # discord.py only decodes bodies whose content-type is exactly application/json.
+    return web.Response(
+        body=json.dumps(data).encode("utf-8"),
+        status=status,
+        headers={"Content-Type": "application/json"},
+    )
+
+
+class FakeServer:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests = Counter()
+        self.errors = 0
+        self.app = web.Application(middlewares=[self._middleware])
+        self.runner = None
+        self.url = None
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        route = request.match_info.route.resource
+        self.requests[f"{request.method} {route.canonical if route else request.path}"] += 1
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.errors += 1
+            return json_response({"message": "injected failure"}, status=500)
+        return await handler(request)
+
+    @property
+    def total_requests(self):
+        return sum(self.requests.values())
+
+    async def start(self):
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self.runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        return self
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+
+class FakeDiscord(FakeServer):
+    """Just enough of the v10 REST API for login and the bot's commands."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.bot_user = user_payload(BOT_USER_ID, "Lil", bot=True)
+        self.sent = Counter()    # channel_id -> messages posted
+        self.edited = Counter()  # channel_id -> messages edited
+        r = self.app.router
+        r.add_get("/api/v10/users/@me", self.me)
+        r.add_get("/api/v10/oauth2/applications/@me", self.application)
+        r.add_post("/api/v10/channels/{channel_id}/messages", self.create_message)
+        r.add_patch("/api/v10/channels/{channel_id}/messages/{message_id}", self.edit_message)
+        r.add_delete("/api/v10/channels/{channel_id}/messages/{message_id}", self.no_content)
+        r.add_put("/api/v10/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me", self.no_content)
+        r.add_post("/api/v10/users/@me/channels", self.create_dm)
+        r.add_get("/api/v10/guilds/{guild_id}/members/{user_id}", self.get_member)
+        r.add_patch("/api/v10/guilds/{guild_id}/members/{user_id}", self.edit_member)
+        r.add_put("/api/v10/guilds/{guild_id}/members/{user_id}/roles/{role_id}", self.no_content)
+        r.add_route("*", "/{tail:.*}", self.no_content)
+
+    async def me(self, request):
+        return json_response(self.bot_user)
+
+    async def application(self, request):
+        return json_response({
+            "id": str(APPLICATION_ID),
+            "name": "Lil",
+            "description": "",
+            "icon": None,
+            "rpc_origins": None,
+            "bot_public": True,
+            "bot_require_code_grant": False,
+            "owner": user_payload(OWNER_ID, "owner"),
+            "team": None,
+            "verify_key": "0" * 64,
+            "flags": 0,
+            "summary": "",
+            "tags": [],
+            "redirect_uris": [],
+            "interactions_endpoint_url": None,
+        })
+
+    async def _body(self, request):
+        if request.content_type == "application/json":
+            return await request.json()
+        return {}
+
+    async def create_message(self, request):
+        body = await self._body(request)
+        channel_id = request.match_info["channel_id"]
+        self.sent[channel_id] += 1
+        embeds = body.get("embeds") or ([body["embed"]] if body.get("embed") else [])
+        return json_response(message_payload(
+            snowflake(), channel_id, None, self.bot_user, body.get("content") or "", embeds=embeds,
+        ))
+
+    async def edit_message(self, request):
+        body = await self._body(request)
+        channel_id = request.match_info["channel_id"]
+        self.edited[channel_id] += 1
+        return json_response(message_payload(
+            request.match_info["message_id"], channel_id, None, self.bot_user,
+            body.get("content") or "", embeds=body.get("embeds") or [],
+        ))
+
+    async def get_member(self, request):
+        return json_response(member_payload(user_payload(request.match_info["user_id"], "member")))
+
+    async def edit_member(self, request):
+        body = await self._body(request)
+        user = user_payload(request.match_info["user_id"], "member")
+        return json_response(member_payload(user, body.get("roles") or ()))
+
+    async def create_dm(self, request):
+        body = await self._body(request)
+        recipient = user_payload(body.get("recipient_id", 0), "member")
+        return json_response({"id": snowflake(), "type": 1, "recipients": [recipient], "last_message_id": None})
+
+    async def no_content(self, request):
+        return web.Response(status=204)
+
+
+class FakeGateway(FakeServer):
+    """A gateway that identifies the bot and hands it `guilds` ready-made guilds.
+
+    Every GUILD_CREATE carries the full member list, so discord.py sees the
+    guilds as chunked and on_ready fires after guild_ready_timeout without
+    any REQUEST_GUILD_MEMBERS round trips. Frames are plain JSON text.
+    """
+
+    def __init__(self, guilds=10, members=50, **kwargs):
+        super().__init__(**kwargs)
+        self.bot_user = user_payload(BOT_USER_ID, "Lil", bot=True)
+        self.guilds = [self.guild(900000000000100000 + g * 100000, members) for g in range(guilds)]
+        self.app.router.add_get("/", self.connect)
+
+    def guild(self, guild_id, members):
+        users = [user_payload(guild_id + 10 + i, f"member{i}") for i in range(members)]
+        member_list = [member_payload(u) for u in users] + [member_payload(self.bot_user)]
+        return guild_payload(guild_id, [channel_payload(guild_id + 1, guild_id, "general")], member_list, [])
+
+    async def connect(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({"op": 10, "d": {"heartbeat_interval": 41250}})
+        seq = itertools.count(1)
+        async for msg in ws:
+            payload = json.loads(msg.data)
+            if payload["op"] == 1:
+                await ws.send_json({"op": 11, "d": None})
+            elif payload["op"] == 2:
+                await ws.send_json({"op": 0, "t": "READY", "s": next(seq), "d": {
+                    "v": 10,
+                    "user": self.bot_user,
+                    "guilds": [{"id": g["id"], "unavailable": True} for g in self.guilds],
+                    "session_id": "fake-session",
+                    "resume_gateway_url": self.url.replace("http", "ws", 1),
+                    "application": {"id": str(APPLICATION_ID), "flags": 0},
+                }})
+                for guild in self.guilds:
+                    await ws.send_json({"op": 0, "t": "GUILD_CREATE", "s": next(seq), "d": guild})
+        return ws
+
+
+class FakeGiphy(FakeServer):
+    def __init__(self, total_count=500, **kwargs):
+        super().__init__(**kwargs)
+        self.total_count = total_count
+        self.app.router.add_get("/v1/gifs/search", self.search)
+
+    async def search(self, request):
+        term = request.query.get("q", "")
+        limit = int(request.query.get("limit", 25))
+        offset = int(request.query.get("offset", 0))
+        data = [
+            {"images": {"original": {"url": f"https://media.giphy.test/{term.replace(' ', '-')}/{offset + i}.gif"}}}
+            for i in range(limit)
+        ]
+        return json_response({
+            "data": data,
+            "pagination": {"total_count": self.total_count, "count": limit, "offset": offset},
+        })
+
+
+class FakeVlr(FakeServer):
+    """live_score feed with a few matches whose scores move every `change_every` calls."""
+
+    TEAMS = [("Paper Rex", "Team Secret"), ("Sentinels", "LOUD"), ("Fnatic", "DRX"), ("Gen.G", "EDG")]
+
+    def __init__(self, live_matches=3, change_every=2, **kwargs):
+        super().__init__(**kwargs)
+        self.live_matches = live_matches
+        self.change_every = change_every
+        self.calls = 0
+        self.app.router.add_get("/match", self.match)
+
+    async def match(self, request):
+        q = request.query.get("q", "live_score")
+        if q == "upcoming":
+            return json_response({"data": {"status": 200, "segments": self.schedule(upcoming=True)}})
+        if q == "results":
+            return json_response({"data": {"status": 200, "segments": self.schedule(upcoming=False)}})
+        self.calls += 1
+        step = self.calls // self.change_every
+        segments = []
+        for i, (t1, t2) in enumerate(self.TEAMS[:self.live_matches]):
+            segments.append({
+                "team1": t1,
+                "team2": t2,
+                "score1": str((step + i) % 3),
+                "score2": str(step % 2),
+                "team1_logo": "//owcdn.test/t1.png",
+                "team2_logo": "//owcdn.test/t2.png",
+                "match_event": "Champions Tour",
+                "match_series": "Playoffs",
+                "match_page": f"https://www.vlr.gg/{400000 + i}/{t1.lower()}-vs-{t2.lower()}",
+            })
+        return json_response({"data": {"status": 200, "segments": segments}})
+
+    def schedule(self, upcoming):
+        segments = []
+        for i in range(20):
+            t1, t2 = self.TEAMS[i % len(self.TEAMS)]
+            seg = {
+                "team1": t1,
+                "team2": t2,
+                "flag1": "flag_sg",
+                "flag2": "flag_us",
+                "match_series": "Upper Bracket" if i % 2 else "Group Stage",
+                "match_event": "Champions Tour" if i % 3 else "Masters",
+                "match_page": f"https://www.vlr.gg/{(410000 if upcoming else 390000) + i}/{t1.lower()}-vs-{t2.lower()}",
+            }
+            if upcoming:
+                seg["time_until_match"] = f"{i + 1}h from now"
+            else:
+                seg.update(score1=str(2 - i % 2), score2=str(i % 2), time_completed=f"{i + 1}h ago")
+            segments.append(seg)
+        return segments
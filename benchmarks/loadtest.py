@@ -0,0 +1,303 @@
+"""Offline load test for the bot.
+
+Drives main.py's real on_message/command pipeline against local fakes of
+Discord's REST API, Giphy and vlrggapi (see fakes.py), so it runs on a plain
+Linux box with no network and no real tokens. Gateway traffic is simulated by
+building discord.Message objects from raw payloads and handing them to
+on_message; the live scoreboard scenario runs the update loop's body directly.
+
+    python benchmarks/loadtest.py                       # all scenarios
+    python benchmarks/loadtest.py gif-storm --messages 2000 --upstream-latency 0.15
+    python benchmarks/loadtest.py live-channels --channels 100 --ticks 20
+    python benchmarks/loadtest.py join-wave --members 500
+    python benchmarks/loadtest.py greeting-storm --channels 3
+
+Numbers are printed as one row per scenario so runs before and after a change
+can be diffed directly.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+from fakes import (  # noqa: E402
+    FakeDiscord, FakeGiphy, FakeVlr, channel_payload, guild_payload, member_payload,
+    message_payload, role_payload, user_payload,
+)
+
+GUILD_ID = 800000000000000001
+FIRST_CHANNEL_ID = 810000000000000000
+FIRST_MEMBER_ID = 820000000000000000
+FIRST_ROLE_ID = 830000000000000000
+
+GIF_ACTIONS = ("hug", "kiss", "slap", "punch", "kill", "vanish")
+CHATTER = (
+    "good morning everyone", "goodnight chat", "hello hello", "anyone up for ranked?",
+    "lf 2 more for valo", "that clutch was insane", "brb", "gg", "who's streaming tonight",
+)
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Harness:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        fake = dict(jitter=args.jitter, seed=args.seed)
+        self.discord = FakeDiscord(latency=args.discord_latency, **fake)
+        self.giphy = FakeGiphy(latency=args.upstream_latency, error_rate=args.error_rate, **fake)
+        self.vlr = FakeVlr(latency=args.upstream_latency, error_rate=args.error_rate, **fake)
+        self.main = None
+        self.vct = None
+        self.guild = None
+        self.members = []
+        self.channel_ids = []
+
+    async def start(self):
+        for server in (self.discord, self.giphy, self.vlr):
+            await server.start()
+
+        workdir = tempfile.mkdtemp(prefix="lil-loadtest-")
+        os.environ.update({
+            "DISCORD_TOKEN": "load-test",
+            "GIPHY_API_KEY": "load-test",
+            "GIPHY_API_BASE": self.giphy.url,
+            "VLR_API_BASE": self.vlr.url,
+            "LIL_DB_PATH": os.path.join(workdir, "lil.db"),
+            "LOG_FILE": os.path.join(workdir, "discord.log"),
+            "PORT": "0",
+        })
+        os.chdir(workdir)  # keep legacy status files and other relative paths out of the repo
+
+        import discord
+        import main
+
+        discord.http.Route.BASE = f"{self.discord.url}/api/v10"
+        self.main = main
+        await main.bot.login("load-test")
+        # Measure steady state: pull in the lazy extensions up front.
+        for name in main.bot.enabled_extensions:
+            await main.bot.load_lazy(name)
+        self.vct = main.bot.extensions["cogs.vct"]
+
+        channel_count = max(self.args.channels, 1)
+        self.channel_ids = [FIRST_CHANNEL_ID + i for i in range(channel_count)]
+        channels = [channel_payload(cid, GUILD_ID, f"chat-{i}") for i, cid in enumerate(self.channel_ids)]
+        self.members = [user_payload(FIRST_MEMBER_ID + i, f"member{i}") for i in range(self.args.members)]
+        members = [member_payload(user) for user in self.members]
+        members.append(member_payload(self.discord.bot_user))
+        roles = [
+            role_payload(FIRST_ROLE_ID + i, name, i + 1)
+            for i, name in enumerate(main.bot.extensions["cogs.roles"].GAME_ROLES.values())
+        ]
+        self.guild = main.bot._connection._add_guild_from_data(guild_payload(GUILD_ID, channels, members, roles))
+
+    async def stop(self):
+        main = self.main
+        if main is not None:
+            if main.close_expired_tallies.is_running():
+                main.close_expired_tallies.cancel()
+            await main.bot.close()  # also stops the extensions' loops
+        # Drop leftovers such as delete_after timers so they don't hit stopped fakes.
+        pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for server in (self.discord, self.giphy, self.vlr):
+            await server.stop()
+
+    def message(self, channel_id, content, author=None, mention=None):
+        import discord
+
+        author = author or self.rng.choice(self.members)
+        mentions = []
+        if mention is not None:
+            mentions.append(dict(mention, member=member_payload(mention)))
+            content = f"{content} <@{mention['id']}>"
+        data = message_payload(
+            self.rng.getrandbits(60), channel_id, GUILD_ID, author, content, mentions=mentions,
+        )
+        return discord.Message(state=self.main.bot._connection, channel=self.guild.get_channel(channel_id), data=data)
+
+    async def drive(self, messages):
+        """Feed messages through on_message with bounded concurrency, timing each one."""
+        limiter = asyncio.Semaphore(self.args.concurrency)
+        latencies = []
+
+        async def one(message):
+            async with limiter:
+                started = time.perf_counter()
+                await self.main.on_message(message)
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(m) for m in messages))
+        return latencies, time.perf_counter() - started
+
+    def snapshot(self):
+        return (self.discord.total_requests, self.giphy.total_requests, self.vlr.total_requests)
+
+
+# ===== SCENARIOS =====
+async def gif_storm(h):
+    messages = []
+    for _ in range(h.args.messages):
+        author, target = h.rng.sample(h.members, 2)
+        action = h.rng.choice(GIF_ACTIONS)
+        messages.append(h.message(h.rng.choice(h.channel_ids), f"!{action}", author=author, mention=target))
+    latencies, elapsed = await h.drive(messages)
+    return len(messages), latencies, elapsed
+
+
+async def drain_outboxes(main):
+    # Auto-replies are sent by per-channel workers after the message handler returns.
+    while main.outbox.outboxes:
+        await asyncio.sleep(0.05)
+
+
+async def chatter(h):
+    messages = [h.message(h.rng.choice(h.channel_ids), h.rng.choice(CHATTER)) for _ in range(h.args.messages)]
+    latencies, elapsed = await h.drive(messages)
+    started = time.perf_counter()
+    await drain_outboxes(h.main)
+    return len(messages), latencies, elapsed + time.perf_counter() - started
+
+
+async def greeting_storm(h):
+    """Mostly greetings with a few commands mixed in; latency is reported for the commands."""
+    main = h.main
+    channel_ids = h.channel_ids[:min(h.args.channels, 5)]
+    greetings = ("good morning!!", "goodmorning guys", "morning hello", "good night all")
+    messages, commands = [], set()
+    for i in range(h.args.messages):
+        if i % 10 == 0:
+            message = h.message(h.rng.choice(channel_ids), "!rank")
+            commands.add(message.id)
+        else:
+            message = h.message(h.rng.choice(channel_ids), h.rng.choice(greetings))
+        messages.append(message)
+
+    limiter = asyncio.Semaphore(h.args.concurrency)
+    latencies = []
+
+    async def one(message):
+        async with limiter:
+            started = time.perf_counter()
+            await main.on_message(message)
+            if message.id in commands:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(m) for m in messages))
+    await drain_outboxes(main)
+    return len(messages), latencies, time.perf_counter() - started
+
+
+async def live_channels(h):
+    vct = h.vct
+    channel_ids = h.channel_ids[:h.args.channels]
+    queries = ["", "paper rex", "sentinels", "fnatic"]
+    subscribe = [h.message(cid, f"!vct live {h.rng.choice(queries)}".strip()) for cid in channel_ids]
+    await h.drive(subscribe)
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(h.args.ticks):
+        vct.live_score_feed.fetched_at = 0.0  # ticks are normally >= the feed TTL apart
+        tick_started = time.perf_counter()
+        await h.main.bot.get_cog("Vct").refresh_live_scoreboards()
+        latencies.append(time.perf_counter() - tick_started)
+    return h.args.ticks, latencies, time.perf_counter() - started
+
+
+async def join_wave(h):
+    import discord
+
+    main = h.main
+    main.WELCOME_DIGEST_DELAY = 0.2  # the digest normally waits to collect joins
+    members = [
+        discord.Member(data=member_payload(user), guild=h.guild, state=main.bot._connection)
+        for user in h.members
+    ]
+    latencies = []
+    started = time.perf_counter()
+    for member in members:
+        join_started = time.perf_counter()
+        await main.on_member_join(member)
+        latencies.append(time.perf_counter() - join_started)
+    welcome = main.welcome
+    while welcome.sent + welcome.closed_dms + welcome.failed + welcome.digested + welcome.undelivered < len(members):
+        await asyncio.sleep(0.05)
+    return len(members), latencies, time.perf_counter() - started
+
+
+SCENARIOS = {
+    "gif-storm": gif_storm,
+    "chatter": chatter,
+    "live-channels": live_channels,
+    "join-wave": join_wave,
+    "greeting-storm": greeting_storm,
+}
+
+
+def print_row(name, count, latencies, elapsed, before, after):
+    discord_calls, giphy_calls, vlr_calls = (b - a for a, b in zip(before, after))
+    rate = count / elapsed if elapsed else 0.0
+    print(
+        f"{name:<14} {count:>7} {elapsed:>8.2f}s {rate:>9.1f}/s "
+        f"{percentile(latencies, 0.5) * 1000:>8.1f}ms {percentile(latencies, 0.99) * 1000:>8.1f}ms "
+        f"{discord_calls:>8} {giphy_calls:>6} {vlr_calls:>5}"
+    )
+
+
+async def run(args):
+    harness = Harness(args)
+    await harness.start()
+    try:
+        print(
+            f"{'scenario':<14} {'items':>7} {'elapsed':>9} {'throughput':>11} "
+            f"{'p50':>10} {'p99':>10} {'discord':>8} {'giphy':>6} {'vlr':>5}"
+        )
+        for name in args.scenarios or list(SCENARIOS):
+            before = harness.snapshot()
+            count, latencies, elapsed = await SCENARIOS[name](harness)
+            print_row(name, count, latencies, elapsed, before, harness.snapshot())
+    finally:
+        await harness.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the Lil bot.")
+    parser.add_argument("scenarios", nargs="*", metavar="scenario",
+                        help=f"one or more of: {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--messages", type=int, default=500, help="messages per message-driven scenario")
+    parser.add_argument("--channels", type=int, default=100, help="text channels / tracked live channels")
+    parser.add_argument("--members", type=int, default=200)
+    parser.add_argument("--ticks", type=int, default=10, help="live update ticks to run")
+    parser.add_argument("--concurrency", type=int, default=50, help="messages in flight at once")
+    parser.add_argument("--discord-latency", type=float, default=0.03, help="seconds per fake Discord request")
+    parser.add_argument("--upstream-latency", type=float, default=0.08, help="seconds per Giphy/vlr request")
+    parser.add_argument("--jitter", type=float, default=0.01, help="extra uniform random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of Giphy/vlr requests that 500")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
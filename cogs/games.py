@@ -0,0 +1,181 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+
+import discord
+from discord.ext import commands
+
+from main import WYR_DURATION, Tally, db_call, track_tally
+
+log = logging.getLogger("lil")
+
+# ===== WYR CONTENT PACK =====
+WYR_PACK_FILE = os.getenv("WYR_PACK", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wyr_pack.json"))
+
+def read_wyr_pack(path):
+    with open(path, "rb") as f:
+        raw = f.read()
+    return hashlib.sha1(raw).hexdigest()[:12], json.loads(raw)
+
+class WyrPack:
+    """Would-you-rather questions from a JSON content pack, indexed by category.
+
+    The pack is {"categories": {"<name>": [["option 1", "option 2"], ...]}};
+    `version` is a hash of the file, so shuffle bags restart when it changes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.version = None
+        self.questions = []
+        self.categories = {}
+
+    async def load(self):
+        version, data = await asyncio.to_thread(read_wyr_pack, self.path)
+        questions, categories = [], {}
+        for name, pairs in (data.get("categories") or {}).items():
+            indexes = categories.setdefault(name.lower(), [])
+            for pair in pairs:
+                if len(pair) == 2:
+                    indexes.append(len(questions))
+                    questions.append(tuple(pair))
+        if not questions:
+            raise ValueError(f"{self.path} has no questions")
+        self.version, self.questions, self.categories = version, questions, categories
+        return len(questions)
+
+wyr_pack = WyrPack(WYR_PACK_FILE)
+
+def load_wyr_bag(db, channel_id, category):
+    return db.execute(
+        "SELECT a, b, pos, size, version FROM wyr_bags WHERE channel_id = ? AND category = ?",
+        (channel_id, category),
+    ).fetchone()
+
+def save_wyr_bag(db, channel_id, category, bag):
+    with db:
+        db.execute(
+            "INSERT OR REPLACE INTO wyr_bags (channel_id, category, a, b, pos, size, version) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (channel_id, category, *bag),
+        )
+
+def new_bag(size, version):
+    # a and b are the two halves of the permutation key.
+    return [random.getrandbits(32), random.getrandbits(32), 0, size, version]
+
+def feistel_round(value, a, b, round_):
+    digest = hashlib.blake2b(f"{a}:{b}:{round_}:{value}".encode(), digest_size=4).digest()
+    return int.from_bytes(digest, "big")
+
+def permute(index, size, a, b):
+    """Position `index` of the permutation of range(size) keyed by (a, b).
+
+    A 4-round Feistel network over the smallest even number of bits that
+    covers `size`; outputs past the end are fed back in (cycle-walking)
+    until one lands in range, which keeps it a bijection on range(size).
+    """
+    half = max(1, (size - 1).bit_length() + 1) // 2
+    mask = (1 << half) - 1
+    value = index
+    while True:
+        left, right = value >> half, value & mask
+        for round_ in range(4):
+            left, right = right, left ^ (feistel_round(right, a, b, round_) & mask)
+        value = (left << half) | right
+        if value < size:
+            return value
+
+class ShuffleBags:
+    """Non-repeating draws per channel and category.
+
+    A bag is a random keyed permutation (see `permute`) that visits every
+    index once per `size` draws. Only the key and position have to be kept,
+    so a draw is O(1) in storage whatever the pack size, and the position
+    survives restarts in the wyr_bags table.
+    """
+
+    def __init__(self):
+        self.bags = {}
+
+    async def draw(self, channel_id, category, size, version):
+        key = (channel_id, category)
+        bag = self.bags.get(key)
+        if bag is None:
+            row = await db_call(load_wyr_bag, channel_id, category)
+            bag = list(row) if row else None
+        if bag is None or bag[2] >= bag[3] or bag[3] != size or bag[4] != version:
+            bag = new_bag(size, version)
+        a, b, pos = bag[0], bag[1], bag[2]
+        bag[2] += 1
+        self.bags[key] = bag
+        await db_call(save_wyr_bag, channel_id, category, bag)
+        return permute(pos, size, a, b)
+
+wyr_bags = ShuffleBags()
+
+class Games(commands.Cog):
+    """Would You Rather, drawn from a JSON content pack."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        try:
+            await wyr_pack.load()
+        except (OSError, ValueError) as e:
+            log.error("Error loading the WYR pack: %s", e)
+
+    @commands.hybrid_command()
+    async def wyr(self, ctx, category: str = None):
+        """Edgy Tagalog Would You Rather game"""
+        if not wyr_pack.questions:
+            await ctx.send("⚠️ No Would You Rather questions are loaded.")
+            return
+        if category:
+            category = category.lower()
+            indexes = wyr_pack.categories.get(category)
+            if not indexes:
+                await ctx.send(f"❌ Unknown category. Try one of: {', '.join(sorted(wyr_pack.categories))}")
+                return
+            draw = await wyr_bags.draw(ctx.channel.id, category, len(indexes), wyr_pack.version)
+            option1, option2 = wyr_pack.questions[indexes[draw]]
+        else:
+            draw = await wyr_bags.draw(ctx.channel.id, "", len(wyr_pack.questions), wyr_pack.version)
+            option1, option2 = wyr_pack.questions[draw]
+
+        embed = discord.Embed(
+            title="🤔 Would You Rather (Pinoy Edition)",
+            description=f"1️⃣ {option1}\n\n2️⃣ {option2}\n\nReact ka na!",
+            color=discord.Color.random(),
+            timestamp=ctx.message.created_at
+        )
+        embed.set_footer(text="📝 Powered by Lil bot • Edgy Tagalog WYR")
+
+        wyr_message = await ctx.send(embed=embed)
+        track_tally(Tally(
+            "Would You Rather", ctx.guild.id if ctx.guild else None, ctx.channel.id, wyr_message.id,
+            [("1️⃣", option1), ("2️⃣", option2)],
+            WYR_DURATION,
+        ))
+
+        # Reactions for voting
+        await wyr_message.add_reaction("1️⃣")
+        await wyr_message.add_reaction("2️⃣")
+
+    @commands.command()
+    @commands.is_owner()
+    async def wyrreload(self, ctx):
+        """Re-read the WYR content pack without restarting."""
+        try:
+            count = await wyr_pack.load()
+        except (OSError, ValueError) as e:
+            await ctx.send(f"❌ Couldn't reload the WYR pack: {e}")
+            return
+        await ctx.send(f"✅ Loaded {count} questions in {len(wyr_pack.categories)} categories.")
+
+async def setup(bot):
+    await bot.add_cog(Games(bot))
@@ -0,0 +1,515 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from collections import OrderedDict
+
+import aiohttp
+import discord
+from discord.ext import commands
+
+from main import GIPHY_API_KEY, MULTI_PROCESS, SHARD_PROCESSES, LazyMember, db_call, metrics
+
+log = logging.getLogger("lil")
+
+# ===== GIPHY CACHE =====
+GIPHY_API_BASE = os.getenv("GIPHY_API_BASE", "https://api.giphy.com")
+GIPHY_SEARCH_URL = f"{GIPHY_API_BASE}/v1/gifs/search"
+GIPHY_PAGE_SIZE = 25
+GIPHY_MAX_OFFSET = 500        # Giphy stops returning useful results past this
+GIPHY_POOL_TTL = 60 * 60      # seconds before a pool is refreshed
+GIPHY_POOL_LOW_WATER = 5      # refill in the background below this many URLs
+GIPHY_MAX_TERMS = 64          # search terms kept in memory (LRU)
+GIPHY_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=3)
+GIF_COMMAND_BUDGET = 1.5      # seconds a GIF command waits on Giphy before falling back
+GIF_FALLBACK_PER_TERM = 50    # URLs kept on disk per search term for outages
+GIF_SEEDS_PER_TERM = 10       # URLs per term written out by !gifseeds
+GIF_SEEDS_FILE = os.getenv("GIF_SEEDS", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gif_seeds.json"))
+GIPHY_QUOTA_PER_HOUR = int(os.getenv("GIPHY_QUOTA_PER_HOUR", "100"))  # beta keys get 100/hour
+GIPHY_QUOTA_BURST = int(os.getenv("GIPHY_QUOTA_BURST", "10"))
+GIPHY_QUEUE_MAX = 8           # refills allowed to wait for a token at once
+GIPHY_QUEUE_WAIT = 5 * 60     # seconds a refill may wait for a token before giving up
+GIF_ACTION_COOLDOWN = 5.0     # seconds between GIF actions, per user
+
+class TokenBucket:
+    """Request budget refilled at `rate` tokens per second, holding at most `capacity`.
+
+    A caller that finds the bucket empty reserves the next token and sleeps
+    until it is due, as long as fewer than `max_waiters` are already queued
+    and the wait fits in `max_wait`; otherwise it is turned away at once.
+    """
+
+    def __init__(self, rate, capacity, max_waiters, max_wait):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_waiters = max_waiters
+        self.max_wait = max_wait
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.waiters = 0
+        self.rejected = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    @property
+    def remaining(self):
+        self._refill()
+        return max(0, int(self.tokens))
+
+    async def acquire(self):
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        wait = (1 - self.tokens) / self.rate
+        if self.waiters >= self.max_waiters or wait > self.max_wait:
+            self.rejected += 1
+            return False
+        self.tokens -= 1  # reserved: the balance goes negative until the refill catches up
+        self.waiters += 1
+        try:
+            await asyncio.sleep(wait)
+        finally:
+            self.waiters -= 1
+        return True
+
+# Only pool refills take tokens, and they run in the background: a command
+# stops waiting after GIF_COMMAND_BUDGET and serves a stored GIF either way.
+# So the queue is sized in token intervals (36s each at 100/hour), not
+# against the command budget. When a burst of refills across terms finds
+# the quota spent, they are spread out at the quota rate instead of being
+# dropped, and each lands in its pool for the callers after it.
+giphy_quota = TokenBucket(
+    rate=GIPHY_QUOTA_PER_HOUR / 3600 / (SHARD_PROCESSES if MULTI_PROCESS else 1),  # the key is shared
+    capacity=GIPHY_QUOTA_BURST,
+    max_waiters=GIPHY_QUEUE_MAX,
+    max_wait=GIPHY_QUEUE_WAIT,
+)
+
+class CircuitBreaker:
+    """Fails fast after `threshold` consecutive failures.
+
+    Once open, requests are refused until `cooldown` seconds have passed;
+    then a single probe is let through and its outcome closes or re-opens
+    the breaker.
+    """
+
+    def __init__(self, threshold=5, cooldown=30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if self.probing else "open"
+
+    def allow(self):
+        if self.opened_at is None:
+            return True
+        if not self.probing and time.monotonic() - self.opened_at >= self.cooldown:
+            self.probing = True
+            return True
+        return False
+
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def abort(self):
+        # The allowed request was never sent; let the next caller probe.
+        self.probing = False
+
+    def failure(self):
+        self.failures += 1
+        self.probing = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+giphy_breaker = CircuitBreaker()
+
+def load_gif_fallbacks(db):
+    return db.execute("SELECT term, url FROM gif_fallback").fetchall()
+
+def insert_gif_fallbacks(db, rows):
+    with db:
+        db.executemany("INSERT OR IGNORE INTO gif_fallback (term, url) VALUES (?, ?)", rows)
+
+def read_gif_seeds(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("terms") or {}
+
+def is_bundled_gif(gif):
+    # Seed entries that aren't URLs name GIF files shipped next to the seed list.
+    return not gif.startswith(("http://", "https://"))
+
+def write_gif_seeds(path, terms):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"terms": terms}, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+class GifFallbacks:
+    """GIF URLs kept on disk per search term, served while Giphy is unavailable.
+
+    Starts from the seed list shipped in GIF_SEEDS_FILE, so a fresh deploy
+    has something to show, and fills itself from successful Giphy pages
+    until it holds GIF_FALLBACK_PER_TERM URLs per term. The GIF files
+    bundled with the bot are only served when no URL is known for a term.
+    """
+
+    def __init__(self):
+        self.urls = {}
+        self.writes = set()  # strong refs to pending inserts
+
+    async def load(self):
+        try:
+            seeds = await asyncio.to_thread(read_gif_seeds, GIF_SEEDS_FILE)
+        except (OSError, ValueError) as e:
+            log.error("Error loading the GIF seed list: %s", e)
+            seeds = {}
+        for term, urls in seeds.items():
+            self.urls[term] = list(dict.fromkeys(urls))
+        for term, url in await db_call(load_gif_fallbacks):
+            known = self.urls.setdefault(term, [])
+            if url not in known:
+                known.append(url)
+
+    def pick(self, term):
+        urls = self.urls.get(term)
+        if not urls:
+            return None
+        remote = [u for u in urls if not is_bundled_gif(u)]
+        return random.choice(remote or urls)
+
+    def remember(self, term, urls):
+        known = self.urls.setdefault(term, [])
+        room = GIF_FALLBACK_PER_TERM - len(known)
+        if room <= 0:
+            return
+        new = [u for u in urls if u not in known][:room]
+        if new:
+            known.extend(new)
+            task = asyncio.create_task(db_call(insert_gif_fallbacks, [(term, u) for u in new]))
+            self.writes.add(task)
+            task.add_done_callback(self.writes.discard)
+
+gif_fallbacks = GifFallbacks()
+
+class GifPool:
+    def __init__(self):
+        self.urls = []
+        self.fetched_at = 0.0
+        self.offset = 0
+        self.refill_task = None
+
+    def is_stale(self):
+        return time.monotonic() - self.fetched_at > GIPHY_POOL_TTL
+
+class GiphyCache:
+    """Per-search-term pools of GIF URLs.
+
+    Each Giphy search returns a full page of results; instead of keeping one
+    and dropping the rest, every URL is served once before the pool is
+    refilled from the next page in the background.
+    """
+
+    def __init__(self, max_terms=GIPHY_MAX_TERMS):
+        self.max_terms = max_terms
+        self.pools = OrderedDict()
+        self.upstream_calls = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _pool(self, term):
+        pool = self.pools.get(term)
+        if pool is None:
+            pool = self.pools[term] = GifPool()
+            while len(self.pools) > self.max_terms:
+                _, evicted = self.pools.popitem(last=False)
+                if evicted.refill_task:
+                    evicted.refill_task.cancel()
+        else:
+            self.pools.move_to_end(term)
+        return pool
+
+    async def get(self, session, term):
+        pool = self._pool(term)
+        if not pool.urls:
+            # Cold (or drained) pool: the caller has to wait for one fetch,
+            # but concurrent callers share it.
+            self.misses += 1
+            await asyncio.shield(self._schedule_refill(session, term, pool))
+            if not pool.urls:
+                return None
+        else:
+            self.hits += 1
+
+        if len(pool.urls) > 1:
+            url = pool.urls.pop(random.randrange(len(pool.urls)))
+        else:
+            url = pool.urls[0]  # keep serving the last one until a refill lands
+
+        if len(pool.urls) <= GIPHY_POOL_LOW_WATER or pool.is_stale():
+            self._schedule_refill(session, term, pool)
+        return url
+
+    def _schedule_refill(self, session, term, pool):
+        if pool.refill_task is None or pool.refill_task.done():
+            pool.refill_task = asyncio.create_task(self._refill(session, term, pool))
+        return pool.refill_task
+
+    async def _refill(self, session, term, pool):
+        stale = pool.is_stale()
+        fresh, next_offset = await self._fetch_page(session, term, pool.offset)
+        if not fresh:
+            return
+        if stale:
+            pool.urls = fresh
+        else:
+            pool.urls = list(dict.fromkeys(pool.urls + fresh))
+        pool.offset = next_offset
+        pool.fetched_at = time.monotonic()
+
+    async def _fetch_page(self, session, term, offset):
+        params = {
+            "api_key": GIPHY_API_KEY,
+            "q": term,
+            "limit": GIPHY_PAGE_SIZE,
+            "offset": offset,
+            "rating": "pg-13",
+            "lang": "en"
+        }
+        if not giphy_breaker.allow():
+            return [], offset  # Giphy keeps failing; don't make callers wait on it
+
+        # Every way out reports to the breaker, or a half-open probe that
+        # never finished would keep it closed to everyone for good.
+        outcome = giphy_breaker.abort
+        try:
+            if not await giphy_quota.acquire():
+                return [], offset  # out of quota; callers fall back to stored GIFs
+            self.upstream_calls += 1
+            outcome = giphy_breaker.failure
+            async with session.get(GIPHY_SEARCH_URL, params=params, timeout=GIPHY_REQUEST_TIMEOUT) as resp:
+                if resp.status != 200:
+                    return [], offset
+                data = await resp.json()
+            outcome = giphy_breaker.success
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            log.warning("Error fetching Giphy GIFs: %s", e)
+            return [], offset
+        except asyncio.CancelledError:
+            outcome = giphy_breaker.abort  # evicted or unloaded, says nothing about Giphy
+            raise
+        finally:
+            outcome()
+
+        urls = []
+        for gif in data.get("data") or []:
+            try:
+                urls.append(gif["images"]["original"]["url"])
+            except (KeyError, TypeError):
+                continue
+
+        gif_fallbacks.remember(term, urls)
+
+        total = (data.get("pagination") or {}).get("total_count") or 0
+        next_offset = offset + GIPHY_PAGE_SIZE
+        if next_offset >= min(total, GIPHY_MAX_OFFSET):
+            next_offset = 0
+        return urls, next_offset
+
+giphy_cache = GiphyCache()
+
+GAUGES = {
+    "lil_giphy_cache_hits": lambda: giphy_cache.hits,
+    "lil_giphy_cache_misses": lambda: giphy_cache.misses,
+    "lil_giphy_breaker_open": lambda: int(giphy_breaker.state != "closed"),
+    "lil_giphy_quota_remaining": lambda: giphy_quota.remaining,
+    "lil_giphy_quota_queued": lambda: giphy_quota.waiters,
+    "lil_giphy_quota_rejected": lambda: giphy_quota.rejected,
+}
+
+async def fetch_giphy_gif(session, search_term):
+    # Commands get a fixed latency budget; a refill that misses it keeps
+    # running in the background (the cache shields it) for the next caller.
+    try:
+        url = await asyncio.wait_for(giphy_cache.get(session, search_term), GIF_COMMAND_BUDGET)
+    except asyncio.TimeoutError:
+        url = None
+    return url or gif_fallbacks.pick(search_term)
+
+async def send_gif(ctx, embed, gif):
+    if not is_bundled_gif(gif):
+        embed.set_image(url=gif)
+        await ctx.send(embed=embed)
+        return
+    path = os.path.join(os.path.dirname(GIF_SEEDS_FILE), gif)
+    embed.set_image(url=f"attachment://{os.path.basename(path)}")
+    await ctx.send(embed=embed, file=discord.File(path))
+
+# One shared per-user cooldown for every GIF action, so alternating
+# commands can't get around it.
+gif_action_cooldowns = commands.CooldownMapping.from_cooldown(1, GIF_ACTION_COOLDOWN, commands.BucketType.user)
+
+def use_gif_cooldown(ctx):
+    # Called from the command body once the target is known to be valid, not
+    # as a check: !help runs every check, and a usage reply shouldn't cost
+    # the user their next GIF. discord.py passes CommandErrors raised here
+    # straight to on_command_error, like a check's.
+    bucket = gif_action_cooldowns.get_bucket(ctx.message)
+    retry_after = bucket.update_rate_limit()
+    if retry_after:
+        raise commands.CommandOnCooldown(bucket, retry_after, commands.BucketType.user)
+
+class Gifs(commands.Cog):
+    """Anime GIF actions backed by a pooled Giphy cache."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        await gif_fallbacks.load()
+        for name, fn in GAUGES.items():
+            metrics.gauge(name, fn)
+
+    async def cog_unload(self):
+        for name in GAUGES:
+            metrics.gauges.pop(name, None)
+        for pool in giphy_cache.pools.values():
+            if pool.refill_task:
+                pool.refill_task.cancel()
+
+    @commands.command()
+    @commands.is_owner()
+    async def gifseeds(self, ctx):
+        """Write the stored fallback GIFs out as the seed list shipped with the bot."""
+        terms = {term: urls[:GIF_SEEDS_PER_TERM] for term, urls in sorted(gif_fallbacks.urls.items()) if urls}
+        try:
+            await asyncio.to_thread(write_gif_seeds, GIF_SEEDS_FILE, terms)
+        except OSError as e:
+            await ctx.send(f"❌ Couldn't write the GIF seed list: {e}")
+            return
+        await ctx.send(f"✅ Wrote {sum(map(len, terms.values()))} GIFs for {len(terms)} terms to `{GIF_SEEDS_FILE}`.")
+
+    def stats_field(self):
+        return "Giphy", (
+            f"Quota: {giphy_quota.remaining}/{giphy_quota.capacity} left • {GIPHY_QUOTA_PER_HOUR}/hour\n"
+            f"Queued: {giphy_quota.waiters} • Turned away: {giphy_quota.rejected}\n"
+            f"Cache hits: {giphy_cache.hits} • misses: {giphy_cache.misses} • breaker {giphy_breaker.state}"
+        )
+
+    @commands.hybrid_command()
+    async def kiss(self, ctx, member: LazyMember = None):
+        if not member:
+            await ctx.send("You need to mention someone to kiss! 😳")
+            return
+        if member == ctx.author:
+            await ctx.send("Awww, self-love is important! 😘")
+            return
+        use_gif_cooldown(ctx)
+        await ctx.defer()  # Giphy can take a moment; acknowledge slash invocations first
+        gif = await fetch_giphy_gif(self.bot.http_session, "anime kiss")
+        if not gif:
+            await ctx.send("Couldn't fetch a kiss GIF right now, try again later!")
+            return
+        embed = discord.Embed(description=f"💋 {ctx.author.mention} kisses {member.mention}!", color=discord.Color.pink())
+        await send_gif(ctx, embed, gif)
+
+    @commands.hybrid_command()
+    async def slap(self, ctx, member: LazyMember = None):
+        if not member:
+            await ctx.send("Mention someone to slap! 😡")
+            return
+        if member == ctx.author:
+            await ctx.send("Why are you slapping yourself? 😢")
+            return
+        use_gif_cooldown(ctx)
+        await ctx.defer()
+        gif = await fetch_giphy_gif(self.bot.http_session, "anime slap")
+        if not gif:
+            await ctx.send("Couldn't fetch a slap GIF right now, try again later!")
+            return
+        embed = discord.Embed(description=f"👋 {ctx.author.mention} slaps {member.mention}!", color=discord.Color.red())
+        await send_gif(ctx, embed, gif)
+
+    @commands.hybrid_command()
+    async def hug(self, ctx, member: LazyMember = None):
+        if not member:
+            await ctx.send("You gotta mention someone to hug! 🤗")
+            return
+        if member == ctx.author:
+            await ctx.send("Sending a virtual hug to yourself 🤗💖")
+            return
+        use_gif_cooldown(ctx)
+        await ctx.defer()
+        gif = await fetch_giphy_gif(self.bot.http_session, "anime hug")
+        if not gif:
+            await ctx.send("Couldn't fetch a hug GIF right now, try again later!")
+            return
+        embed = discord.Embed(description=f"🤗 {ctx.author.mention} gives {member.mention} a warm hug!", color=discord.Color.blue())
+        await send_gif(ctx, embed, gif)
+
+    @commands.hybrid_command()
+    async def punch(self, ctx, member: LazyMember = None):
+        """Playful, non-graphic punch (like slap)."""
+        if not member:
+            await ctx.send("Mention someone to punch! (playfully) 🥊")
+            return
+        if member == ctx.author:
+            await ctx.send("Why are you punching yourself? Be kind to yourself! 🤕")
+            return
+        use_gif_cooldown(ctx)
+        await ctx.defer()
+        gif = await fetch_giphy_gif(self.bot.http_session, "anime punch")
+        if not gif:
+            await ctx.send("Couldn't fetch a punch GIF right now, try again later!")
+            return
+        embed = discord.Embed(description=f"🥊 {ctx.author.mention} playfully punches {member.mention}!", color=discord.Color(0xE53935))
+        await send_gif(ctx, embed, gif)
+
+    @commands.hybrid_command()
+    async def kill(self, ctx, member: LazyMember = None):
+        """Cute boop command — PG friendly."""
+        if not member:
+            await ctx.send("Who do you want to kill? Mention someone! 👀")
+            return
+        if member == ctx.author:
+            await ctx.send("Killing yourself? A+ self-harm. 🤗")
+            return
+        use_gif_cooldown(ctx)
+        await ctx.defer()
+        gif = await fetch_giphy_gif(self.bot.http_session, "kill anime")
+        if not gif:
+            await ctx.send("Couldn't fetch a kill GIF right now, try again later!")
+            return
+        embed = discord.Embed(description=f"👆 {ctx.author.mention} gives {member.mention} a finishing blow!", color=discord.Color.blue())
+        await send_gif(ctx, embed, gif)
+
+    @commands.hybrid_command()
+    async def vanish(self, ctx, member: LazyMember = None):
+        """Playful 'vanish' — harmless alternative to destructive commands."""
+        target_text = f" at {member.mention}" if member and member != ctx.author else ""
+        if member == ctx.author:
+            await ctx.send("You try to vanish... but you're still here. ✨")
+            return
+        use_gif_cooldown(ctx)
+        await ctx.defer()
+        gif = await fetch_giphy_gif(self.bot.http_session, "poof disappear anime")
+        if not gif:
+            await ctx.send(f"{ctx.author.mention} dramatically vanishes{target_text}... (but comes back soon).")
+            return
+        embed = discord.Embed(description=f"✨ {ctx.author.mention} dramatically vanishes{target_text}... (it's just a prank!)", color=discord.Color.purple())
+        await send_gif(ctx, embed, gif)
+
+async def setup(bot):
+    await bot.add_cog(Gifs(bot))
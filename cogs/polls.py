@@ -0,0 +1,76 @@
+import random
+
+import discord
+from discord.ext import commands
+
+from main import POLL_DURATION, Tally, latest_tally, tallies, tally_embed, track_tally
+
+class Polls(commands.Cog):
+    """Reaction polls and their running tallies."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.hybrid_command()
+    @commands.guild_only()
+    async def pollresults(self, ctx, message_id: str = None):
+        """Current (or final) counts for the latest poll, or the given message id."""
+        # A str, because snowflakes overflow Discord's INTEGER slash option.
+        if message_id is None:
+            tally = tallies.get(latest_tally.get(ctx.guild.id))
+        else:
+            tally = tallies.get(int(message_id)) if message_id.isdecimal() else None
+        if tally is None or tally.guild_id != ctx.guild.id:
+            await ctx.send("❌ No poll found.")
+            return
+        await ctx.send(embed=tally_embed(tally))
+
+    @commands.hybrid_command()
+    async def poll(self, ctx, *, question):
+        await ctx.defer()
+        target_channel_id = 1407904625969074216
+        target_channel = self.bot.get_channel(target_channel_id)
+
+        if not target_channel:
+            await ctx.send("❌ Couldn't find the target poll channel.")
+            return
+
+        embed = discord.Embed(
+            title="📢 **THOUGHTS NI LIL – CAST YOUR VOTE!**",
+            description=(
+                f"**⬇️ QUESTION:**\n"
+                f"__{question}__\n\n"
+                f"👍 = Agree\n"
+                f"👎 = Disagree\n"
+                f"🤔 = Neutral / Thinking\n\n"
+                f"🗳️ React below to vote!"
+            ),
+            color=random.choice([
+                discord.Color.green(),
+                discord.Color.blue(),
+                discord.Color.purple(),
+                discord.Color.gold()
+            ]),
+            timestamp=ctx.message.created_at
+        )
+
+        embed.set_thumbnail(url="https://i.pinimg.com/736x/5c/dd/8d/5cdd8d89ce9d32e38f97c50ccece9933.jpg")
+        embed.set_footer(
+            text="📝 Powered by Lil bot • Made by aiz",
+            icon_url=ctx.guild.icon.url if ctx.guild.icon else None
+        )
+
+        poll_message = await target_channel.send(embed=embed)
+        track_tally(Tally(
+            question, ctx.guild.id, target_channel.id, poll_message.id,
+            [("👍", "Agree"), ("👎", "Disagree"), ("🤔", "Neutral / Thinking")],
+            POLL_DURATION,
+        ))
+        await poll_message.add_reaction("👍")
+        await poll_message.add_reaction("👎")
+        await poll_message.add_reaction("🤔")
+
+        await ctx.send(f"✅ Your poll has been posted in {target_channel.mention}!")
+
+async def setup(bot):
+    await bot.add_cog(Polls(bot))
@@ -0,0 +1,130 @@
+from discord.ext import commands
+
+valorant_role = "Valorant"
+tft_role = "Teamfight Tactics"
+lol_role = "League of Legends"
+
+# Self-assignable roles: !roles <key> ... and the per-game commands.
+GAME_ROLES = {
+    "valorant": valorant_role,
+    "tft": tft_role,
+    "lol": lol_role,
+}
+
+# ===== ROLE INDEX =====
+class RoleIndex:
+    """name -> role id per guild, built on first use and kept current by role events."""
+
+    def __init__(self):
+        self._by_guild = {}
+
+    def _index(self, guild):
+        index = self._by_guild.get(guild.id)
+        if index is None:
+            index = {}
+            for role in guild.roles:
+                index.setdefault(role.name, role.id)  # first match wins, like utils.get
+            self._by_guild[guild.id] = index
+        return index
+
+    def get(self, guild, name):
+        role_id = self._index(guild).get(name)
+        return guild.get_role(role_id) if role_id is not None else None
+
+    def added(self, role):
+        index = self._by_guild.get(role.guild.id)
+        if index is not None:
+            index.setdefault(role.name, role.id)
+
+    def removed(self, role):
+        index = self._by_guild.get(role.guild.id)
+        if index is not None and index.get(role.name) == role.id:
+            # Another role may share the name; rebuild on next lookup.
+            del self._by_guild[role.guild.id]
+
+    def forget_guild(self, guild_id):
+        self._by_guild.pop(guild_id, None)
+
+role_index = RoleIndex()
+
+async def assign_game_role(ctx, role_name):
+    role = role_index.get(ctx.guild, role_name)
+    if role:
+        await ctx.author.add_roles(role)
+        await ctx.send(f"{ctx.author.mention} is now assigned to {role_name}!")
+    else:
+        await ctx.send("Role doesn't exist")
+
+class Roles(commands.Cog):
+    """Self-assignable game roles."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role):
+        role_index.added(role)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        role_index.removed(role)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before, after):
+        if before.name != after.name:
+            role_index.removed(before)
+            role_index.added(after)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        role_index.forget_guild(guild.id)
+
+    @commands.hybrid_command()
+    @commands.guild_only()
+    async def valorant(self, ctx):
+        await assign_game_role(ctx, valorant_role)
+
+    @commands.hybrid_command()
+    @commands.guild_only()
+    async def tft(self, ctx):
+        await assign_game_role(ctx, tft_role)
+
+    @commands.hybrid_command()
+    @commands.guild_only()
+    async def lol(self, ctx):
+        await assign_game_role(ctx, lol_role)
+
+    @commands.hybrid_command()
+    @commands.guild_only()
+    async def roles(self, ctx, *, keys: str = ""):
+        """Assign several game roles at once, e.g. !roles valorant tft lol"""
+        keys = keys.split()
+        if not keys:
+            await ctx.send(f"Usage: `!roles {' '.join(GAME_ROLES)}`")
+            return
+
+        wanted, unknown = [], []
+        for key in dict.fromkeys(k.lower() for k in keys):
+            name = GAME_ROLES.get(key)
+            role = role_index.get(ctx.guild, name) if name else None
+            if role is None:
+                unknown.append(key)
+            elif role not in ctx.author.roles:
+                wanted.append(role)
+
+        if wanted:
+            # atomic=False sends one member PATCH with the full role list instead
+            # of one PUT per role.
+            await ctx.author.add_roles(*wanted, atomic=False)
+
+        parts = []
+        if wanted:
+            parts.append(f"{ctx.author.mention} is now assigned to {', '.join(r.name for r in wanted)}!")
+        elif not unknown:
+            parts.append(f"{ctx.author.mention} already has those roles.")
+        if unknown:
+            parts.append(f"Unknown roles: {', '.join(unknown)}")
+        await ctx.send("\n".join(parts))
+
+async def setup(bot):
+    await bot.add_cog(Roles(bot))
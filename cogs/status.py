@@ -0,0 +1,142 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+
+from discord.ext import commands
+
+from main import MULTI_PROCESS, data_version, db_call
+
+log = logging.getLogger("lil")
+
+# ===== STATUS STORE =====
+# One entry per person with a !<command> status. Adding someone is one more
+# line here; legacy_file is only read once to migrate the old JSON files.
+STATUS_PEOPLE = [
+    {"command": "lil", "name": "Lil", "user_id": 625311802703740968, "emoji": "📢", "legacy_file": "CHI_status.json"},
+    {"command": "sav", "name": "Sav", "user_id": 734792664767266957, "emoji": "😡", "legacy_file": "SAV_status.json"},
+    {"command": "yuks", "name": "Yuks", "user_id": 1280132085616738387, "emoji": "😏", "legacy_file": "YUKS_status.json"},
+]
+
+STATUS_FLUSH_DELAY = 2.0  # seconds of write-behind batching
+
+def read_legacy_status(file):
+    try:
+        with open(file, "r") as f:
+            return json.load(f).get("status", None)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def load_statuses(db):
+    return dict(db.execute("SELECT user_id, status FROM statuses").fetchall())
+
+def load_statuses_since(db, version):
+    current = data_version(db)
+    return current, (load_statuses(db) if current != version else None)
+
+def write_statuses(db, batch):
+    # One transaction per batch, so a crash never leaves a half-written row.
+    with db:
+        db.executemany(
+            "INSERT OR REPLACE INTO statuses (user_id, status, updated_at) VALUES (?, ?, ?)",
+            batch,
+        )
+
+class StatusStore:
+    """In-memory status map with write-behind persistence to SQLite."""
+
+    def __init__(self):
+        self.statuses = {}
+        self._pending = {}
+        self._flush_task = None
+        self._version = None
+
+    async def load(self):
+        self.statuses = await db_call(load_statuses)
+        for person in STATUS_PEOPLE:
+            legacy = person.get("legacy_file")
+            if person["user_id"] in self.statuses or not legacy:
+                continue
+            status = await asyncio.to_thread(read_legacy_status, legacy)
+            if status is not None:
+                self.set(person["user_id"], status)
+
+    async def sync(self):
+        """Pick up statuses other worker processes have written since the last look."""
+        if not MULTI_PROCESS:
+            return
+        self._version, statuses = await db_call(load_statuses_since, self._version)
+        if statuses is not None:
+            statuses.update((row[0], row[1]) for row in self._pending.values())
+            self.statuses = statuses
+
+    def get(self, user_id):
+        return self.statuses.get(user_id)
+
+    def set(self, user_id, status):
+        self.statuses[user_id] = status
+        self._pending[user_id] = (user_id, status, time.time())
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(STATUS_FLUSH_DELAY)
+        await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        batch = list(self._pending.values())
+        self._pending.clear()
+        try:
+            await db_call(write_statuses, batch)
+        except sqlite3.Error as e:
+            log.error("Error saving statuses: %s", e)
+            for row in batch:
+                self._pending.setdefault(row[0], row)
+
+status_store = StatusStore()
+
+# ===== STATUS COMMANDS =====
+def make_status_command(person):
+    name = person["name"]
+    possessive = f"{name}'" if name.endswith("s") else f"{name}'s"
+
+    async def status_command(ctx, *, status: str = None):
+        if status is None:
+            await status_store.sync()
+            current = status_store.get(person["user_id"])
+            if current:
+                await ctx.send(f"{person['emoji']} {name} is currently **{current}**!")
+            else:
+                await ctx.send(f"{name} status has not been set yet.")
+            return
+
+        if ctx.author.id != person["user_id"]:
+            await ctx.send(f"❌ You are not allowed to change {possessive} status.")
+            return
+
+        status_store.set(person["user_id"], status)
+        await ctx.send(f"✅ {possessive} status has been set to **{status}**!")
+
+    return commands.hybrid_command(name=person["command"], help=f"Show or set {possessive} status.")(status_command)
+
+class Status(commands.Cog):
+    """Per-person status commands (!lil, !sav, !yuks)."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        await status_store.load()
+
+    async def cog_unload(self):
+        await status_store.flush()
+
+async def setup(bot):
+    await bot.add_cog(Status(bot))
+    # Built from STATUS_PEOPLE, so they're added here rather than declared
+    # on the cog; unloading the extension still removes them with the module.
+    for person in STATUS_PEOPLE:
+        bot.add_command(make_status_command(person))
@@ -0,0 +1,619 @@
+import asyncio
+import datetime
+import hashlib
+import json
+import logging
+import os
+import time
+
+import aiohttp
+import discord
+from discord.ext import commands, tasks
+
+from main import (
+    MULTI_PROCESS, WORKER_INDEX, acquire_lease, db_call, metrics, owns_guild, publish_feed, read_feed,
+)
+
+log = logging.getLogger("lil")
+
+# ===== Helpers =====
+def normalize_url(u: str) -> str:
+    if not u:
+        return None
+    if u.startswith("//"):
+        return "https:" + u
+    if u.startswith("/"):
+        return "https://www.vlr.gg" + u
+    return u
+
+# ===== VLR.GG FETCH LAYER =====
+VLR_API_BASE = os.getenv("VLR_API_BASE", "https://vlrggapi.vercel.app")
+LIVE_SCORE_TTL = 10  # seconds a live_score payload is reused
+
+class CoalescedFetch:
+    """Single-flight GET with a short-lived cached result.
+
+    Concurrent callers wait on the same in-flight request, and anyone
+    arriving within `ttl` seconds of a successful fetch reuses its payload.
+    """
+
+    def __init__(self, url, ttl):
+        self.url = url
+        self.ttl = ttl
+        self.value = None
+        self.fetched_at = 0.0
+        self.inflight = None
+        self.upstream_calls = 0
+        self.saved_calls = 0
+
+    async def get(self, session):
+        if self.value is not None and time.monotonic() - self.fetched_at < self.ttl:
+            self.saved_calls += 1
+            return self.value
+        if self.inflight is not None and not self.inflight.done():
+            self.saved_calls += 1
+        else:
+            self.inflight = asyncio.create_task(self._fetch(session))
+        return await asyncio.shield(self.inflight)
+
+    async def _fetch(self, session):
+        self.upstream_calls += 1
+        async with session.get(self.url) as resp:
+            if resp.status != 200:
+                return None
+            data = await resp.json()
+        self.value = data
+        self.fetched_at = time.monotonic()
+        return data
+
+class SharedFetch(CoalescedFetch):
+    """CoalescedFetch whose payload is shared between worker processes.
+
+    Only the worker holding the feed's lease calls upstream; it publishes
+    each payload to SQLite and the other workers read it back from there.
+    If the holder stops renewing (it exited, or has nothing to poll for),
+    the next worker to ask takes the lease over.
+    """
+
+    def __init__(self, name, url, ttl, lease_seconds):
+        super().__init__(url, ttl)
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.leader = not MULTI_PROCESS
+
+    async def _fetch(self, session):
+        if not MULTI_PROCESS:
+            return await super()._fetch(session)
+        self.leader = await db_call(acquire_lease, self.name, str(os.getpid()), self.lease_seconds)
+        if self.leader:
+            data = await super()._fetch(session)
+            if data is not None:
+                await db_call(publish_feed, self.name, json.dumps(data))
+            return data
+
+        self.saved_calls += 1
+        payload = await db_call(read_feed, self.name)
+        if payload is None:
+            return None
+        self.value = json.loads(payload)
+        self.fetched_at = time.monotonic()
+        return self.value
+
+# The lease outlives one fast poll interval, so the polling worker keeps it
+# while matches are live.
+live_score_feed = SharedFetch("live_score", f"{VLR_API_BASE}/match?q=live_score", LIVE_SCORE_TTL, lease_seconds=90)
+
+def extract_matches(data):
+    data = data.get("data", {})
+    return data.get("segments", []) or data.get("matches", [])
+
+# ===== LIVE SCOREBOARD =====
+LIVE_EDIT_CONCURRENCY = 5  # simultaneous message edits per tick
+LIVE_POLL_FAST = 30        # seconds between polls while a followed match is live
+LIVE_POLL_MAX = 300        # back-off ceiling when nothing followed is live
+
+# channel_id -> LiveSubscription
+live_subscriptions = {}
+
+class LiveSubscription:
+    def __init__(self, guild_id, channel_id, message_id, query=None, match_id=None):
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.query = query        # team name / match id, None = top live match
+        self.match_id = match_id  # match currently being followed
+
+    def partial_message(self, client):
+        # Edits only need the ids, so full Message objects are never fetched or kept.
+        channel = client.get_partial_messageable(self.channel_id, guild_id=self.guild_id)
+        return channel.get_partial_message(self.message_id)
+
+def load_trackers(db):
+    rows = db.execute(
+        "SELECT guild_id, channel_id, message_id, query, match_id FROM live_trackers"
+    ).fetchall()
+    return [LiveSubscription(*row) for row in rows]
+
+def save_tracker(db, sub):
+    with db:
+        db.execute(
+            "INSERT OR REPLACE INTO live_trackers (channel_id, guild_id, message_id, query, match_id) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (sub.channel_id, sub.guild_id, sub.message_id, sub.query, sub.match_id),
+        )
+
+def delete_tracker(db, channel_id):
+    with db:
+        db.execute("DELETE FROM live_trackers WHERE channel_id = ?", (channel_id,))
+
+async def untrack_channel(channel_id):
+    live_match_hashes.pop(channel_id, None)
+    if live_subscriptions.pop(channel_id, None):
+        await db_call(delete_tracker, channel_id)
+        return True
+    return False
+
+# channel_id -> fingerprint of the embed last pushed to that channel
+live_match_hashes = {}
+
+def match_id_of(seg):
+    # match_page looks like https://www.vlr.gg/<id>/<slug>
+    page = seg.get("match_page") or ""
+    for part in page.split("/"):
+        if part.isdigit():
+            return part
+    t1 = seg.get("team1") or seg.get("team1_name") or "TBD"
+    t2 = seg.get("team2") or seg.get("team2_name") or "TBD"
+    return f"{t1} vs {t2}".lower()
+
+def find_match(matches, query):
+    """Pick the live segment a subscription query refers to."""
+    if not matches:
+        return None
+    if not query:
+        return matches[0]
+
+    q = query.lower().strip()
+    for seg in matches:
+        if match_id_of(seg) == q or q in (seg.get("match_page") or "").lower():
+            return seg
+    for seg in matches:
+        teams = (
+            seg.get("team1") or seg.get("team1_name") or "",
+            seg.get("team2") or seg.get("team2_name") or "",
+        )
+        if any(q in team.lower() for team in teams):
+            return seg
+    return None
+
+def build_live_embed(seg):
+    t1 = seg.get("team1") or seg.get("team1_name") or "TBD"
+    t2 = seg.get("team2") or seg.get("team2_name") or "TBD"
+    s1 = seg.get("score1") or seg.get("team1_score") or seg.get("score_a")
+    s2 = seg.get("score2") or seg.get("team2_score") or seg.get("score_b")
+    event = seg.get("match_event") or seg.get("tournament_name") or "Unknown Event"
+    series = seg.get("match_series") or seg.get("round_info") or ""
+    logo1 = normalize_url(seg.get("team1_logo") or seg.get("flag1"))
+    logo2 = normalize_url(seg.get("team2_logo") or seg.get("flag2"))
+
+    embed = discord.Embed(
+        title=f"🏆 {event}",
+        description=f"**{series}**\n\n🔴 **LIVE NOW**",
+        color=discord.Color.red(),
+        timestamp=datetime.datetime.utcnow()
+    )
+
+    # Logos
+    if logo1:
+        embed.set_thumbnail(url=logo1)  # left team
+    if logo2:
+        embed.set_author(name=t2, icon_url=logo2)  # right team
+
+    # Scoreboard
+    embed.add_field(
+        name="📊 Scoreboard",
+        value=f"🟥 **{t1}** `{s1}`  ⚔️  `{s2}` **{t2}** 🟦",
+        inline=False
+    )
+
+    # Maps info
+    if seg.get("maps"):
+        maps_info = []
+        for m in seg["maps"]:
+            map_name = m.get("map", "Unknown Map")
+            mscore = m.get("score", "–")
+            maps_info.append(f"• **{map_name}** → `{mscore}`")
+        embed.add_field(
+            name="🗺️ Maps",
+            value="\n".join(maps_info),
+            inline=False
+        )
+
+    embed.set_footer(text="Auto-updating while live • Data from vlr.gg API")
+    return embed
+
+def embed_fingerprint(embed):
+    # The timestamp changes on every render, so leave it out of the hash.
+    data = embed.to_dict()
+    data.pop("timestamp", None)
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+async def push_live_embed(client, sub, embed, digest, limiter):
+    channel_id = sub.channel_id
+    if live_match_hashes.get(channel_id) == digest:
+        return  # nothing changed since the last edit
+
+    # Message edits are rate-limited per channel, so each channel is its own
+    # bucket; the semaphore only caps how many we have in flight at once.
+    async with limiter:
+        try:
+            await sub.partial_message(client).edit(embed=embed)
+        except (discord.NotFound, discord.Forbidden):
+            log.info("Live match message in %s is gone, untracking it", channel_id)
+            await untrack_channel(channel_id)
+        except discord.HTTPException as e:
+            log.warning("Failed to update live match message in %s: %s", channel_id, e)
+        else:
+            live_match_hashes[channel_id] = digest
+
+# ===== VCT SCHEDULE =====
+VCT_SCHEDULE_REFRESH = 10 * 60  # seconds between upstream refreshes
+VCT_RESULTS_KEPT = 200          # results retained after they drop off the upstream page
+VCT_LIST_LIMIT = 10             # matches shown per !vct upcoming/results
+
+def load_vct_matches(db, feed, newest_first):
+    order = "DESC" if newest_first else "ASC"
+    return db.execute(
+        f"SELECT payload FROM vct_matches WHERE feed = ? ORDER BY seen {order}", (feed,)
+    ).fetchall()
+
+def update_vct_matches(db, feed, changed, removed):
+    # seen is only set on insert, so it keeps the order matches first appeared in.
+    with db:
+        db.executemany(
+            "INSERT INTO vct_matches (feed, match_id, payload, seen) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(feed, match_id) DO UPDATE SET payload = excluded.payload",
+            [(feed, match_id, payload, seen) for match_id, payload, seen in changed],
+        )
+        db.executemany(
+            "DELETE FROM vct_matches WHERE feed = ? AND match_id = ?",
+            [(feed, match_id) for match_id in removed],
+        )
+
+class MatchFeedCache:
+    """One vlrggapi match feed (upcoming or results), served from memory.
+
+    The feed is mirrored to SQLite so it survives restarts, refreshed in the
+    background, and only matches whose payload changed are written back.
+    `by_team` and `by_event` map lowercased names to match ids, so lookups
+    never touch the network.
+    """
+
+    def __init__(self, feed, newest_first, keep=None):
+        self.feed = feed
+        self.newest_first = newest_first  # results: newest first; upcoming: soonest first
+        self.keep = keep                  # None = drop matches as soon as upstream does
+        self.matches = {}
+        self.by_team = {}
+        self.by_event = {}
+        self.refreshed_at = None
+
+    async def load(self):
+        rows = await db_call(load_vct_matches, self.feed, self.newest_first)
+        self._replace(json.loads(payload) for (payload,) in rows)
+
+    async def reload(self):
+        # Another worker holds the refresh lease and writes the table for us.
+        await self.load()
+        self.refreshed_at = time.time()
+
+    async def refresh(self, session):
+        async with session.get(f"{VLR_API_BASE}/match", params={"q": self.feed}) as resp:
+            if resp.status != 200:
+                log.warning("vlrggapi %s returned %s", self.feed, resp.status)
+                return
+            data = await resp.json()
+
+        fresh = {match_id_of(seg): seg for seg in extract_matches(data)}
+        step = -1e-6 if self.newest_first else 1e-6
+        now = time.time()
+        changed = [
+            (match_id, json.dumps(seg, sort_keys=True), now + i * step)
+            for i, (match_id, seg) in enumerate(fresh.items())
+            if self.matches.get(match_id) != seg
+        ]
+        merged = dict(fresh)
+        if self.keep:
+            for match_id, seg in self.matches.items():
+                if len(merged) >= self.keep:
+                    break
+                merged.setdefault(match_id, seg)
+        removed = [match_id for match_id in self.matches if match_id not in merged]
+        if changed or removed:
+            await db_call(update_vct_matches, self.feed, changed, removed)
+        self._replace(merged.values())
+        self.refreshed_at = time.time()
+
+    def _replace(self, segments):
+        self.matches = {}
+        self.by_team = {}
+        self.by_event = {}
+        for seg in segments:
+            match_id = match_id_of(seg)
+            self.matches[match_id] = seg
+            for team in (seg.get("team1"), seg.get("team2")):
+                if team:
+                    self.by_team.setdefault(team.lower(), []).append(match_id)
+            event = seg.get("match_event") or seg.get("tournament_name")
+            if event:
+                self.by_event.setdefault(event.lower(), []).append(match_id)
+
+    def search(self, query=None, limit=VCT_LIST_LIMIT):
+        if not query:
+            return list(self.matches.values())[:limit]
+        q = query.lower().strip()
+        ids = set()
+        for index in (self.by_team, self.by_event):
+            for name, match_ids in index.items():
+                if q in name:
+                    ids.update(match_ids)
+        return [seg for match_id, seg in self.matches.items() if match_id in ids][:limit]
+
+vct_schedule = {
+    "upcoming": MatchFeedCache("upcoming", newest_first=False),
+    "results": MatchFeedCache("results", newest_first=True, keep=VCT_RESULTS_KEPT),
+}
+
+def schedule_embed(mode, matches, query):
+    title = "📅 Upcoming VCT matches" if mode == "upcoming" else "🏁 Recent VCT results"
+    if query:
+        title += f" • {query}"
+    lines = []
+    for seg in matches:
+        t1 = seg.get("team1") or "TBD"
+        t2 = seg.get("team2") or "TBD"
+        event = seg.get("match_event") or seg.get("tournament_name") or "Unknown Event"
+        series = seg.get("match_series") or seg.get("round_info") or ""
+        if mode == "upcoming":
+            when = seg.get("time_until_match") or ""
+            lines.append(f"**{t1}** vs **{t2}** • {when}\n╰ {event} {series}".rstrip())
+        else:
+            when = seg.get("time_completed") or ""
+            lines.append(f"**{t1}** `{seg.get('score1', '–')}` – `{seg.get('score2', '–')}` **{t2}** • {when}\n╰ {event} {series}".rstrip())
+    embed = discord.Embed(title=title, description="\n".join(lines), color=discord.Color.red())
+    embed.set_footer(text="Data from vlr.gg API • refreshed every few minutes")
+    return embed
+
+GAUGES = {
+    "lil_live_subscriptions": lambda: len(live_subscriptions),
+    "lil_live_score_upstream_calls": lambda: live_score_feed.upstream_calls,
+    "lil_live_score_saved_calls": lambda: live_score_feed.saved_calls,
+}
+
+class Vct(commands.Cog):
+    """VCT schedule, results and auto-updating live scoreboards."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        for name, fn in GAUGES.items():
+            metrics.gauge(name, fn)
+        for cache in vct_schedule.values():
+            await cache.load()
+        self.refresh_vct_schedule.start()
+
+        # Resume scoreboards tracked before the last restart.
+        for sub in await db_call(load_trackers):
+            if owns_guild(sub.guild_id):
+                live_subscriptions[sub.channel_id] = sub
+        if live_subscriptions:
+            self.update_live_matches.start()
+
+    async def cog_unload(self):
+        self.refresh_vct_schedule.cancel()
+        self.update_live_matches.cancel()
+        for name in GAUGES:
+            metrics.gauges.pop(name, None)
+
+    def schedule_next_poll(self, any_live):
+        if any_live:
+            seconds = LIVE_POLL_FAST
+        else:
+            seconds = min(self.update_live_matches.seconds * 2, LIVE_POLL_MAX)
+        if seconds != self.update_live_matches.seconds:
+            self.update_live_matches.change_interval(seconds=seconds)
+
+    @tasks.loop(seconds=LIVE_POLL_FAST)
+    async def update_live_matches(self):
+        started = time.perf_counter()
+        try:
+            await self.refresh_live_scoreboards()
+        finally:
+            metrics.observe("lil_live_tick_duration_seconds", time.perf_counter() - started)
+
+    async def refresh_live_scoreboards(self):
+        if not live_subscriptions:
+            self.update_live_matches.stop()
+            return
+
+        try:
+            data = await live_score_feed.get(self.bot.http_session)
+        except Exception as e:
+            log.warning("Error fetching live matches: %s", e)
+            self.schedule_next_poll(False)
+            return
+        if data is None:
+            # Upstream error, or no shared payload yet: keep following the same
+            # matches rather than treating it as "nothing is live".
+            self.schedule_next_poll(False)
+            return
+        matches = extract_matches(data)
+
+        # One poll fans out to every subscription through a match_id index.
+        by_id = {match_id_of(seg): seg for seg in matches}
+        followers = {}
+        for sub in list(live_subscriptions.values()):
+            if sub.match_id not in by_id:
+                seg = find_match(matches, sub.query)
+                match_id = match_id_of(seg) if seg else None
+                if match_id != sub.match_id:
+                    sub.match_id = match_id
+                    await db_call(save_tracker, sub)
+            if sub.match_id is not None:
+                followers.setdefault(sub.match_id, []).append(sub)
+
+        limiter = asyncio.Semaphore(LIVE_EDIT_CONCURRENCY)
+        pushes = []
+        for match_id, subs in followers.items():
+            embed = build_live_embed(by_id[match_id])
+            digest = embed_fingerprint(embed)
+            pushes.extend(push_live_embed(self.bot, sub, embed, digest, limiter) for sub in subs)
+        await asyncio.gather(*pushes)
+
+        self.schedule_next_poll(bool(followers))
+
+    @update_live_matches.before_loop
+    async def before_update_live_matches(self):
+        await self.bot.wait_until_ready()
+
+    @tasks.loop(seconds=VCT_SCHEDULE_REFRESH)
+    async def refresh_vct_schedule(self):
+        leader = not MULTI_PROCESS or await db_call(
+            acquire_lease, "vct_schedule", str(os.getpid()), VCT_SCHEDULE_REFRESH * 2
+        )
+        for cache in vct_schedule.values():
+            try:
+                await (cache.refresh(self.bot.http_session) if leader else cache.reload())
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                log.warning("Error refreshing VCT %s: %s", cache.feed, e)
+
+    @commands.hybrid_command()
+    async def vct(self, ctx, mode: str = "upcoming", *, query: str = None):
+        mode = mode.lower()
+        # In live mode the board itself goes to the channel, so the reply to
+        # the interaction (and its "thinking" placeholder) is only for the caller.
+        await ctx.defer(ephemeral=mode == "live")
+
+        if mode == "live":
+            try:
+                data = await live_score_feed.get(self.bot.http_session)
+            except Exception as e:
+                log.warning("Error fetching live matches: %s", e)
+                data = None
+            if data is None:
+                await ctx.send("⚠️ No live matches right now.")
+                return
+
+            matches = extract_matches(data)
+            if not matches:
+                await ctx.send("ℹ️ No live matches at the moment.")
+                return
+
+            seg = find_match(matches, query)
+            if seg is None:
+                await ctx.send(f"ℹ️ No live match found for **{query}**.")
+                return
+            t1 = seg.get("team1") or seg.get("team1_name") or "TBD"
+            t2 = seg.get("team2") or seg.get("team2_name") or "TBD"
+            s1 = seg.get("score1") or seg.get("team1_score") or seg.get("score_a") or 0
+            s2 = seg.get("score2") or seg.get("team2_score") or seg.get("score_b") or 0
+            event = seg.get("match_event") or seg.get("tournament_name") or "Unknown Event"
+            series = seg.get("match_series") or seg.get("round_info") or "BO3"
+            logo1 = normalize_url(seg.get("team1_logo") or seg.get("flag1"))
+            logo2 = normalize_url(seg.get("team2_logo") or seg.get("flag2"))
+
+            bans_picks = seg.get("bans_picks") or "No bans/picks info available."
+
+            embed = discord.Embed(
+                title=f"🏆 {event}",
+                description=f"**{series}** • 🔴 LIVE NOW",
+                color=discord.Color.red(),
+                timestamp=datetime.datetime.utcnow()
+            )
+
+            # Team logos
+            if logo1:
+                embed.set_thumbnail(url=logo1)  # Left team
+            if logo2:
+                embed.set_image(url=logo2)  # Right team (will show large image on the side)
+
+            # Scoreboard with VS in the middle
+            embed.add_field(
+                name=f"{t1} 🟥",
+                value=f"**{s1}**",
+                inline=True
+            )
+            embed.add_field(
+                name="⚔️ VS ⚔️",
+                value="—",
+                inline=True
+            )
+            embed.add_field(
+                name=f"🟦 {t2}",
+                value=f"**{s2}**",
+                inline=True
+            )
+
+            # Bans / Picks / Map info
+            if bans_picks:
+                embed.add_field(
+                    name="🎮 Bans / Picks",
+                    value=bans_picks,
+                    inline=False
+                )
+
+            embed.set_footer(text="Auto-updating while live • Powered by vlr.gg")
+
+            if ctx.interaction is None:
+                msg = await ctx.send(embed=embed)
+            else:
+                # Interaction replies are only editable through a token that
+                # expires, so the auto-updating board is a plain channel message.
+                msg = await ctx.channel.send(embed=embed)
+                await ctx.send("🔴 Tracking this match here.", ephemeral=True)
+            guild_id = ctx.guild.id if ctx.guild else None
+            sub = LiveSubscription(guild_id, ctx.channel.id, msg.id, query, match_id_of(seg))
+            live_subscriptions[ctx.channel.id] = sub
+            live_match_hashes.pop(ctx.channel.id, None)
+            await db_call(save_tracker, sub)
+
+            # A new follower resets the back-off so the board updates promptly.
+            self.update_live_matches.change_interval(seconds=LIVE_POLL_FAST)
+            if not self.update_live_matches.is_running():
+                self.update_live_matches.start()
+
+        elif mode in vct_schedule:
+            cache = vct_schedule[mode]
+            if cache.refreshed_at is None and not cache.matches:
+                await ctx.send("⏳ The VCT schedule is still loading, try again in a moment.")
+                return
+            matches = cache.search(query)
+            if not matches:
+                await ctx.send(f"ℹ️ No {mode} matches found{f' for **{query}**' if query else ''}.")
+                return
+            await ctx.send(embed=schedule_embed(mode, matches, query))
+
+        elif mode == "stop":
+            if await untrack_channel(ctx.channel.id):
+                await ctx.send("🛑 Stopped live match tracking in this channel.")
+            else:
+                await ctx.send("ℹ️ This channel isn't tracking a live match.")
+
+        elif mode == "stats":
+            feed = live_score_feed
+            where = f" (worker {WORKER_INDEX}{', polling vlr.gg' if feed.leader else ''})" if MULTI_PROCESS else ""
+            await ctx.send(
+                f"📈 live_score: **{feed.upstream_calls}** upstream calls, "
+                f"**{feed.saved_calls}** saved by caching/coalescing{where}."
+            )
+
+        else:
+            await ctx.send(
+                "⚠️ Use `!vct upcoming [team or event]`, `!vct results [team or event]`, "
+                "`!vct live [team or match id]` for live match tracking, `!vct stop` to stop."
+            )
+
+async def setup(bot):
+    await bot.add_cog(Vct(bot))
@@ -0,0 +1,85 @@
+import re
+
+# Actions a keyword rule can take when one of its triggers appears in a message.
+ACTIONS = ("reply", "delete", "react")
+
+
+class Rule:
+    __slots__ = ("id", "triggers", "action", "response")
+
+    def __init__(self, rule_id, triggers, action, response=None):
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action {action!r}, expected one of {', '.join(ACTIONS)}")
+        triggers = tuple(t.lower() for t in triggers if t and t.strip())
+        if not triggers:
+            raise ValueError("A rule needs at least one trigger")
+        self.id = rule_id
+        self.triggers = triggers
+        self.action = action
+        self.response = response
+
+    def __repr__(self):
+        return f"Rule({self.id!r}, {self.triggers!r}, {self.action!r})"
+
+
+def trie_pattern(words):
+    """Regex source matching any of `words`, longest match first."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = None  # end-of-word marker
+
+    def emit(node):
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        # Greedy optional tail: try the longer trigger first, fall back to
+        # the word that ends here.
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+class KeywordEngine:
+    """Matches every rule against a message in a single regex pass.
+
+    All triggers are folded into one trie-shaped pattern (shared prefixes
+    are factored out, so the regex engine branches on one character at a
+    time instead of retrying hundreds of alternatives), wrapped in a
+    lookahead so the scan reports the longest trigger starting at each
+    position without consuming it. Shorter triggers that start at the same
+    position are always prefixes of the longer one, so they are resolved
+    ahead of time through `_rules_for` instead of needing another pass.
+
+    `match` returns the matching rules in table order, each at most once.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        by_trigger = {}
+        for index, rule in enumerate(self.rules):
+            for trigger in rule.triggers:
+                by_trigger.setdefault(trigger, set()).add(index)
+
+        self._rules_for = {}
+        for trigger in by_trigger:
+            indexes = set()
+            for end in range(1, len(trigger) + 1):
+                indexes |= by_trigger.get(trigger[:end], set())
+            self._rules_for[trigger] = frozenset(indexes)
+
+        if by_trigger:
+            self._pattern = re.compile(f"(?=({trie_pattern(by_trigger)}))")
+        else:
+            self._pattern = None
+
+    def match(self, text):
+        if self._pattern is None or not text:
+            return []
+        hits = set()
+        for m in self._pattern.finditer(text.lower()):
+            hits |= self._rules_for[m.group(1)]
+        return [self.rules[i] for i in sorted(hits)]
@@ -1,282 +1,1330 @@
 import discord
+from discord import app_commands
 from discord.ext import commands, tasks
 import logging
+import logging.handlers
+import queue
 from dotenv import load_dotenv
 import os
 import random
 import aiohttp
+import asyncio
 import json
-from flask import Flask
+import re
+import io
+import math
+import sys
+import traceback
+from aiohttp import web
 import threading
+import sqlite3
+import subprocess
 import datetime
+import functools
+import time
+from collections import OrderedDict, deque
+from keywords import ACTIONS, KeywordEngine, Rule
 
-# ========== FLASK APP FOR RENDER HOSTING ==========
-app = Flask('')
-
-@app.route('/')
-def home():
-    return "Bot is running!"
-
-def run_flask():
-    port = int(os.environ.get("PORT", 5000))
-    app.run(host='0.0.0.0', port=port)
-
-# Start Flask app in a separate thread
-flask_thread = threading.Thread(target=run_flask)
-flask_thread.start()
+# The extensions in cogs/ share state through `from main import ...`; when
+# this file runs as a script, point that at this module instead of letting
+# it import a second copy.
+if __name__ == "__main__":
+    sys.modules.setdefault("main", sys.modules[__name__])
 
 # ========== DISCORD BOT SETUP ==========
 load_dotenv()
 token = os.getenv('DISCORD_TOKEN')
 GIPHY_API_KEY = os.getenv('GIPHY_API_KEY')  # Put your Giphy API key in .env
 
-handler = logging.FileHandler(filename='discord.log', encoding='utf-8', mode='w')
-intents = discord.Intents.default()
-intents.message_content = True
-intents.members = True
+# ===== LOGGING =====
+LOG_FILE = os.getenv("LOG_FILE", "discord.log")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")          # "text" or "json" (one object per line)
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN")        # e.g. "midnight"; unset = rotate by size
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 5 * 1024 * 1024))
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", "5"))
+LOG_GATEWAY_SAMPLE = float(os.getenv("LOG_GATEWAY_SAMPLE", "0.1"))  # share of per-event DEBUG records kept
+
+# Loggers that emit a DEBUG record per gateway event / HTTP request.
+SAMPLED_LOGGERS = ("discord.gateway", "discord.state", "discord.http")
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps({
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }, ensure_ascii=False)
+
+class GatewaySampler(logging.Filter):
+    def filter(self, record):
+        if record.levelno >= logging.INFO or not record.name.startswith(SAMPLED_LOGGERS):
+            return True
+        return random.random() < LOG_GATEWAY_SAMPLE
+
+def setup_logging(level=LOG_LEVEL):
+    """Route all logging through a queue to a rotating file written by a background thread."""
+    if LOG_ROTATE_WHEN:
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            LOG_FILE, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUPS, encoding="utf-8",
+        )
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8",
+        )
+    if LOG_FORMAT == "json":
+        file_handler.setFormatter(JsonFormatter())
+    else:
+        file_handler.setFormatter(logging.Formatter(
+            "[{asctime}] [{levelname:<8}] {name}: {message}", "%Y-%m-%d %H:%M:%S", style="{",
+        ))
 
-bot = commands.Bot(command_prefix='!', intents=intents)
+    # The event loop only pays for a queue put; formatting and disk I/O
+    # happen on the listener thread.
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(GatewaySampler())
 
-valorant_role = "Valorant"
-tft_role = "Teamfight Tactics"
-lol_role = "League of Legends"
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(queue_handler)
 
-live_match_messages = {}
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    return listener
 
-# ===== STATUS FILES =====
-LIL_STATUS_FILE = "CHI_status.json"
-SAV_STATUS_FILE = "SAV_status.json"
-YUKS_STATUS_FILE = "YUKS_status.json"
+intents = discord.Intents.default()
+# Slash commands don't need message content; turning it off leaves prefix
+# commands working only in DMs and when the bot is mentioned.
+intents.message_content = os.getenv("MESSAGE_CONTENT_INTENT", "1") != "0"
+intents.members = True  # still needed for on_member_join, whatever the cache policy
+
+# Which members discord.py keeps in memory:
+#   full   - chunk every guild at startup and cache all members (the default)
+#   recent - no chunking; keep the last MEMBER_LRU_SIZE active members in an LRU
+#   none   - cache nothing; commands fetch the one member they need
+MEMBER_CACHE = os.getenv("MEMBER_CACHE", "full").lower()
+MEMBER_LRU_SIZE = int(os.getenv("MEMBER_LRU_SIZE", "5000"))
+
+def member_cache_kwargs():
+    if MEMBER_CACHE == "full":
+        return {}
+    if MEMBER_CACHE not in ("recent", "none"):
+        raise ValueError(f"MEMBER_CACHE must be full, recent or none, not {MEMBER_CACHE!r}")
+    return {"member_cache_flags": discord.MemberCacheFlags.none(), "chunk_guilds_at_startup": False}
+
+# ===== SHARDING =====
+# Off unless SHARD_COUNT is set. With SHARD_PROCESSES > 1, run_bot() becomes a
+# launcher that splits the shards over that many worker processes; each one
+# gets its SHARD_IDS and LIL_WORKER index from the launcher. Workers share
+# state through the SQLite file at LIL_DB_PATH.
+SHARD_COUNT = os.getenv("SHARD_COUNT")              # a number, or "auto" for Discord's recommendation
+SHARD_PROCESSES = int(os.getenv("SHARD_PROCESSES", "1"))
+SHARD_IDS = [int(i) for i in os.getenv("SHARD_IDS", "").split(",") if i.strip()] or None
+WORKER_INDEX = os.getenv("LIL_WORKER")
+MULTI_PROCESS = WORKER_INDEX is not None and SHARD_PROCESSES > 1
+
+def shard_kwargs():
+    if SHARD_COUNT is None:
+        return {}
+    kwargs = {"shard_count": None if SHARD_COUNT == "auto" else int(SHARD_COUNT)}
+    if SHARD_IDS is not None:
+        kwargs["shard_ids"] = SHARD_IDS
+    return kwargs
+
+def owns_guild(guild_id):
+    """Whether this process runs the shard a guild is assigned to."""
+    if SHARD_IDS is None or guild_id is None:
+        return True
+    return (guild_id >> 22) % int(SHARD_COUNT) in SHARD_IDS
+
+# ===== EXTENSIONS =====
+# Optional subsystems are discord.py extensions in cogs/. LIL_EXTENSIONS picks
+# the ones a deployment runs (comma-separated, e.g. "status,gifs"; default
+# all, empty for none). With LAZY_EXTENSIONS on, an extension is imported the
+# first time one of its commands is used; those mapped to None always load
+# at startup, because they have background work or their command names come
+# from their own data (cogs.status has one per STATUS_PEOPLE entry).
+# `!reload <ext>` swaps one in place without touching the gateway connection.
+EXTENSIONS = {
+    "cogs.status": None,
+    "cogs.roles": ("valorant", "tft", "lol", "roles"),
+    "cogs.gifs": ("kiss", "slap", "hug", "punch", "kill", "vanish", "gifseeds"),
+    "cogs.games": ("wyr", "wyrreload"),
+    "cogs.polls": ("poll", "pollresults"),
+    "cogs.vct": None,
+}
+LIL_EXTENSIONS = os.getenv("LIL_EXTENSIONS")
+LAZY_EXTENSIONS = os.getenv("LAZY_EXTENSIONS", "1") != "0"
+
+def extension_name(name):
+    name = name.strip().lower()
+    return name if name.startswith("cogs.") else f"cogs.{name}"
+
+def configured_extensions():
+    if LIL_EXTENSIONS is None:
+        return list(EXTENSIONS)
+    names = [extension_name(n) for n in LIL_EXTENSIONS.split(",") if n.strip()]
+    unknown = [n for n in names if n not in EXTENSIONS]
+    if unknown:
+        raise ValueError(f"LIL_EXTENSIONS has unknown extensions: {', '.join(unknown)}")
+    return names
+
+class LilTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction):
+        # Slash commands are registered with Discord by !sync, but a lazy
+        # extension's only join the tree once it is loaded.
+        await self.client.load_for_command(interaction.data.get("name"))
+        return True
+
+# ===== SHARED HTTP CLIENT =====
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=5, sock_read=10)
+
+class LilBot(commands.AutoShardedBot if SHARD_COUNT is not None else commands.Bot):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.http_session = None
+        self.enabled_extensions = configured_extensions()
+        self.lazy_commands = {}  # command name -> extension that provides it, until loaded
+        self.extension_lock = asyncio.Lock()
+        self.synced_guilds = set()  # guild ids `!sync guild` copied the slash commands to
+
+    async def setup_hook(self):
+        # One pooled session for Giphy/vlr.gg so connections, TLS sessions
+        # and DNS lookups are reused across commands and loop ticks.
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=20,
+            ttl_dns_cache=300,
+            keepalive_timeout=60,
+            enable_cleanup_closed=True,
+        )
+        self.http_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=HTTP_TIMEOUT,
+            trace_configs=[upstream_trace_config()],
+        )
 
-# ===== STATUS LOADERS =====
-def load_status(file):
-    try:
-        with open(file, "r") as f:
-            return json.load(f).get("status", None)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return None
-
-def save_status(file, status):
-    with open(file, "w") as f:
-        json.dump({"status": status}, f)
-
-# Initial status values
-lil_status = load_status(LIL_STATUS_FILE)
-sav_status = load_status(SAV_STATUS_FILE)
-yuks_status = load_status(YUKS_STATUS_FILE)
-
-# ===== Helpers =====
-def normalize_url(u: str) -> str:
-    if not u:
-        return None
-    if u.startswith("//"):
-        return "https:" + u
-    if u.startswith("/"):
-        return "https://www.vlr.gg" + u
-    return u
-
-async def fetch_giphy_gif(search_term):
-    async with aiohttp.ClientSession() as session:
-        url = "https://api.giphy.com/v1/gifs/search"
-        params = {
-            "api_key": GIPHY_API_KEY,
-            "q": search_term,
-            "limit": 25,
-            "offset": 0,
-            "rating": "pg-13",
-            "lang": "en"
-        }
-        async with session.get(url, params=params) as resp:
-            if resp.status == 200:
-                data = await resp.json()
-                gifs = data.get("data")
-                if gifs:
-                    chosen = random.choice(gifs)
-                    return chosen["images"]["original"]["url"]
-    return None
+        loop_lag.start()
+        welcome.start()
+        await health_server.start()
+
+        await rule_book.load()
+
+        for name in self.enabled_extensions:
+            command_names = EXTENSIONS[name]
+            if LAZY_EXTENSIONS and command_names:
+                self.lazy_commands.update(dict.fromkeys(command_names, name))
+                continue
+            try:
+                await self.load_lazy(name)
+            except commands.ExtensionError as e:
+                log.error("Loading %s failed", name, exc_info=e)
+
+    async def load_lazy(self, name):
+        """Load an enabled extension unless it already is."""
+        async with self.extension_lock:
+            if name in self.extensions:
+                return
+            for command_name in EXTENSIONS[name] or ():
+                self.lazy_commands.pop(command_name, None)
+            started = time.perf_counter()
+            await self.load_extension(name)
+            log.info("Loaded %s in %.1fms", name, (time.perf_counter() - started) * 1000)
+
+    async def load_for_command(self, command_name):
+        """Load the lazy extension providing `command_name`; True if one was loaded."""
+        name = self.lazy_commands.get(command_name)
+        if name is None:
+            return False
+        try:
+            await self.load_lazy(name)
+        except commands.ExtensionError as e:
+            log.error("Loading %s failed", name, exc_info=e)
+            return False
+        return True
+
+    def recopy_guild_commands(self):
+        """Replace the per-guild slash command copies with the current global ones.
+
+        The tree checks a guild's copies before the global commands, so
+        without this a reloaded extension's old commands keep answering in
+        every guild synced with `!sync guild`.
+        """
+        for guild_id in self.synced_guilds:
+            guild = discord.Object(id=guild_id)
+            self.tree.clear_commands(guild=guild)
+            self.tree.copy_global_to(guild=guild)
+
+    async def get_context(self, origin, *, cls=None):
+        ctx = await super().get_context(origin, cls=cls or LilContext)
+        if ctx.command is None and ctx.invoked_with and await self.load_for_command(ctx.invoked_with):
+            ctx = await super().get_context(origin, cls=cls or LilContext)
+        return ctx
+
+    async def close(self):
+        await super().close()  # unloads the extensions, which stop their own loops
+        await health_server.stop()
+        welcome.stop()
+        loop_lag.stop()
+        if self.http_session and not self.http_session.closed:
+            await self.http_session.close()
+
+bot = LilBot(
+    command_prefix='!',
+    intents=intents,
+    tree_cls=LilTree,
+    # How long to wait for more GUILD_CREATEs before on_ready fires.
+    guild_ready_timeout=float(os.getenv("GUILD_READY_TIMEOUT", "2")),
+    **shard_kwargs(),
+    **member_cache_kwargs(),
+)
+
+# ===== METRICS =====
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                break
+        else:
+            i = len(LATENCY_BUCKETS)
+        self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+        self.count += other.count
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation.
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else math.inf
+        return math.inf
+
+class Metrics:
+    """Counters and latency histograms rendered in Prometheus text format."""
+
+    def __init__(self):
+        self.counters = {}    # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> Histogram
+        self.gauges = {}      # name -> callable returning a number
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        hist = self.histograms.get(key)
+        if hist is None:
+            hist = self.histograms[key] = Histogram()
+        hist.observe(value)
+
+    def gauge(self, name, fn):
+        self.gauges[name] = fn
+
+    def render(self):
+        lines = []
+        for (name, labels), value in sorted(self.counters.items()):
+            lines.append(f"{name}{format_labels(labels)} {value}")
+        for (name, labels), hist in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS + ("+Inf",), hist.counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{format_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(labels)} {hist.total:.6f}")
+            lines.append(f"{name}_count{format_labels(labels)} {hist.count}")
+        for name, fn in sorted(self.gauges.items()):
+            try:
+                lines.append(f"{name} {fn()}")
+            except Exception:
+                continue
+        return "\n".join(lines) + "\n"
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+metrics = Metrics()
+
+# --- commands ---
+@bot.listen("on_command")
+async def metrics_command_started(ctx):
+    ctx.metrics_started = time.perf_counter()
+
+def observe_command(ctx, outcome):
+    started = getattr(ctx, "metrics_started", None)
+    if started is not None and ctx.command:
+        metrics.observe(
+            "lil_command_duration_seconds", time.perf_counter() - started,
+            command=ctx.command.qualified_name, outcome=outcome,
+        )
+
+@bot.listen("on_command_completion")
+async def metrics_command_completed(ctx):
+    observe_command(ctx, "ok")
 
 @bot.event
-async def on_ready():
-    print(f"We are ready to log in, {bot.user.name}")
+async def on_command_error(ctx, error):
+    observe_command(ctx, "error")
+
+    # Any on_command_error (event or listener) switches off discord.py's
+    # default handler, so keep logging what it would have logged.
+    if ctx.command and ctx.command.has_error_handler():
+        return
+    if ctx.cog and ctx.cog.has_error_handler():
+        return
+    if isinstance(error, commands.CommandOnCooldown):
+        await ctx.send(f"⏳ Slow down! Try again in {error.retry_after:.0f}s.", delete_after=5)
+        return
+    log.error("Ignoring exception in command %s", ctx.command, exc_info=error)
+
+# --- upstream HTTP (Giphy, vlrggapi) ---
+def upstream_trace_config():
+    trace = aiohttp.TraceConfig()
+
+    async def on_start(session, ctx, params):
+        ctx.started = time.perf_counter()
+
+    async def on_end(session, ctx, params):
+        record_upstream(ctx, params.url.host, str(params.response.status))
+
+    async def on_exception(session, ctx, params):
+        timed_out = isinstance(params.exception, asyncio.TimeoutError)
+        record_upstream(ctx, params.url.host, "timeout" if timed_out else "error")
+
+    trace.on_request_start.append(on_start)
+    trace.on_request_end.append(on_end)
+    trace.on_request_exception.append(on_exception)
+    return trace
+
+def record_upstream(ctx, host, status):
+    metrics.inc("lil_upstream_requests_total", host=host, status=status)
+    metrics.observe("lil_upstream_request_duration_seconds", time.perf_counter() - ctx.started, host=host)
+
+# --- Discord rate limits ---
+class RateLimitCounter(logging.Handler):
+    # discord.py only reports 429s through its 'discord.http' logger.
+    def emit(self, record):
+        if "rate limited" in str(record.msg):
+            metrics.inc("lil_discord_ratelimit_hits_total")
+
+logging.getLogger("discord.http").addHandler(RateLimitCounter(level=logging.WARNING))
+
+metrics.gauge("lil_gateway_latency_seconds", lambda: bot.latency if math.isfinite(bot.latency) else "NaN")
+metrics.gauge("lil_event_loop_lag_seconds", lambda: loop_lag.lag)
+metrics.gauge("lil_event_loop_stalls_total", lambda: loop_lag.stalls)
+metrics.gauge("lil_guilds", lambda: len(bot.guilds))
+metrics.gauge("lil_cached_members", lambda: sum(len(g.members) for g in bot.guilds))
+metrics.gauge("lil_member_lru_size", lambda: len(member_lru.members))
+metrics.gauge("lil_member_fetches", lambda: member_lru.fetches)
+metrics.gauge("lil_welcome_queued", lambda: welcome.queue.qsize())
+metrics.gauge("lil_outbox_channels", lambda: len(outbox.outboxes))
+metrics.gauge("lil_welcome_dms_sent", lambda: welcome.sent)
+metrics.gauge("lil_welcome_dms_closed", lambda: welcome.closed_dms)
+metrics.gauge("lil_welcome_dms_failed", lambda: welcome.failed)
+metrics.gauge("lil_welcome_digested", lambda: welcome.digested)
+metrics.gauge("lil_welcome_undelivered", lambda: welcome.undelivered)
+
+# ===== HEALTH SERVER (RENDER) =====
+LOOP_STALL_THRESHOLD = float(os.getenv("LOOP_STALL_THRESHOLD", "0.25"))  # seconds
+
+log = logging.getLogger("lil")
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up from a fixed sleep.
+
+    A watchdog thread follows the same heartbeat. When the loop goes quiet
+    for longer than the stall threshold it logs the stack of whatever the
+    loop thread is executing at that moment, i.e. the blocking callback.
+    """
+
+    def __init__(self, interval=0.1, stall_threshold=LOOP_STALL_THRESHOLD):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.lag = 0.0
+        self.stalls = 0
+        self.heartbeat = time.monotonic()
+        self.loop_thread_id = None
+        self._task = None
+        self._watchdog = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        if self._watchdog is None:
+            self._stopped.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+        self._stopped.set()
+        self._watchdog = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, loop.time() - start - self.interval)
+            self.heartbeat = time.monotonic()
+
+    def _watch(self):
+        reported = None
+        while not self._stopped.wait(self.interval):
+            beat = self.heartbeat
+            silent = time.monotonic() - beat - self.interval
+            if silent < self.stall_threshold or beat == reported:
+                continue
+            reported = beat  # one report per stall
+            self.stalls += 1
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "  <unknown>\n"
+            log.warning("Event loop stalled for %.0f ms; loop thread is in:\n%s", silent * 1000, stack)
+
+loop_lag = LoopLagMonitor()
+
+# Flipped by gateway events; is_ready() alone stays True across disconnects.
+gateway_state = {"connected": False}
 
 @bot.event
-async def on_member_join(member):
-    await member.send(f"Welcome to the server {member.name}")
+async def on_connect():
+    gateway_state["connected"] = True
 
 @bot.event
-async def on_message(message):
-    if message.author == bot.user:
-        return
+async def on_resumed():
+    gateway_state["connected"] = True
 
-    content = message.content.lower()
+@bot.event
+async def on_disconnect():
+    gateway_state["connected"] = False
+
+def readiness():
+    latency = bot.latency
+    ready = (
+        gateway_state["connected"]
+        and bot.is_ready()
+        and not bot.is_closed()
+        and math.isfinite(latency)
+    )
+    return ready, {
+        "status": "ok" if ready else "unavailable",
+        "gateway_connected": gateway_state["connected"],
+        "ready": bot.is_ready(),
+        "latency_ms": round(latency * 1000, 1) if math.isfinite(latency) else None,
+        "loop_lag_ms": round(loop_lag.lag * 1000, 1),
+        "guilds": len(bot.guilds),
+    }
+
+class HealthServer:
+    """Small aiohttp server on the bot's own loop that answers Render's health checks."""
+
+    def __init__(self):
+        self.app = web.Application()
+        self.app.router.add_get("/", self.health)
+        self.app.router.add_get("/healthz", self.health)
+        self.app.router.add_get("/metrics", self.metrics)
+        self.runner = None
+
+    async def health(self, request):
+        ready, body = readiness()
+        return web.json_response(body, status=200 if ready else 503)
+
+    async def metrics(self, request):
+        return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8")
+
+    async def start(self):
+        port = int(os.environ.get("PORT", 5000))
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, host="0.0.0.0", port=port).start()
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+health_server = HealthServer()
+
+# ===== LOCAL DATABASE =====
+DB_PATH = os.getenv("LIL_DB_PATH", "lil.db")
+
+DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS live_trackers (
+    channel_id INTEGER PRIMARY KEY,
+    guild_id   INTEGER,
+    message_id INTEGER NOT NULL,
+    query      TEXT,
+    match_id   TEXT
+);
+CREATE TABLE IF NOT EXISTS keyword_rules (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id INTEGER NOT NULL,
+    trigger  TEXT NOT NULL,
+    action   TEXT NOT NULL,
+    response TEXT
+);
+CREATE TABLE IF NOT EXISTS gif_fallback (
+    term TEXT NOT NULL,
+    url  TEXT NOT NULL,
+    PRIMARY KEY (term, url)
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name       TEXT PRIMARY KEY,
+    owner      TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS shared_feeds (
+    name       TEXT PRIMARY KEY,
+    payload    TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS vct_matches (
+    feed     TEXT NOT NULL,
+    match_id TEXT NOT NULL,
+    payload  TEXT NOT NULL,
+    seen     REAL NOT NULL,
+    PRIMARY KEY (feed, match_id)
+);
+CREATE TABLE IF NOT EXISTS wyr_bags (
+    channel_id INTEGER NOT NULL,
+    category   TEXT NOT NULL,
+    a          INTEGER NOT NULL,
+    b          INTEGER NOT NULL,
+    pos        INTEGER NOT NULL,
+    size       INTEGER NOT NULL,
+    version    TEXT NOT NULL,
+    PRIMARY KEY (channel_id, category)
+);
+CREATE TABLE IF NOT EXISTS statuses (
+    user_id    INTEGER PRIMARY KEY,
+    status     TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+_db = None
+_db_lock = threading.Lock()
+
+def _open_db():
+    global _db
+    if _db is None:
+        _db = sqlite3.connect(DB_PATH, check_same_thread=False)
+        _db.execute("PRAGMA journal_mode=WAL")
+        _db.execute("PRAGMA synchronous=NORMAL")
+        _db.execute("PRAGMA busy_timeout=5000")  # other worker processes may hold the write lock
+        _db.executescript(DB_SCHEMA)
+    return _db
+
+def _run_db(fn, *args):
+    with _db_lock:
+        return fn(_open_db(), *args)
+
+async def db_call(fn, *args):
+    # sqlite3 blocks, so every query runs on a worker thread.
+    return await asyncio.to_thread(_run_db, fn, *args)
+
+def data_version(db):
+    # Changes whenever another connection (i.e. another worker) commits.
+    return db.execute("PRAGMA data_version").fetchone()[0]
+
+def acquire_lease(db, name, owner, seconds):
+    """Take or renew a named lease; returns True if `owner` holds it afterwards."""
+    now = time.time()
+    with db:
+        db.execute(
+            "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.owner = excluded.owner OR leases.expires_at < ?",
+            (name, owner, now + seconds, now),
+        )
+        row = db.execute("SELECT owner FROM leases WHERE name = ?", (name,)).fetchone()
+    return row is not None and row[0] == owner
+
+def publish_feed(db, name, payload):
+    with db:
+        db.execute(
+            "INSERT OR REPLACE INTO shared_feeds (name, payload, fetched_at) VALUES (?, ?, ?)",
+            (name, payload, time.time()),
+        )
 
-    # Auto-replies for greetings
-    if "goodmorning" in content or "good morning" in content:
-        await message.channel.send(f"Good morning, {message.author.mention}! ☀️")
-    elif "goodnight" in content or "good night" in content:
-        await message.channel.send(f"Good night, {message.author.mention}! 🌙")
-    elif "hello" in content:
-        await message.channel.send(f"Hello there, {message.author.mention}! 👋")
+def read_feed(db, name):
+    row = db.execute("SELECT payload FROM shared_feeds WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
 
-    if "zee" in content:
-        await message.delete()
-        await message.channel.send(f"{message.author.mention} - wag mo banggitin yan!")
+# ===== MEMBER CACHE =====
+MEMBER_ID_RE = re.compile(r"<@!?([0-9]{15,20})>$|([0-9]{15,20})$")
 
-    await bot.process_commands(message)
+class MemberLRU:
+    """Bounded cache of recently seen members, keyed by (guild_id, user_id).
 
-@bot.command()
-async def hello(ctx):
-    await ctx.send(f"Hello {ctx.author.mention}!")
+    Misses are resolved with one fetch_member call; callers asking for the
+    same member while that fetch is in flight share it.
+    """
 
-# ===== STATUS COMMANDS =====
-@bot.command()
-async def lil(ctx, *, status: str = None):
-    global lil_status
-    ALLOWED_USER_ID = 625311802703740968  # Lil's ID
+    def __init__(self, size):
+        self.size = size
+        self.members = OrderedDict()
+        self.inflight = {}
+        self.fetches = 0
 
-    if status is None:
-        if lil_status:
-            await ctx.send(f"📢 Lil is currently **{lil_status}**!")
-        else:
-            await ctx.send("Lil status has not been set yet.")
-    else:
-        if ctx.author.id != ALLOWED_USER_ID:
-            await ctx.send("❌ You are not allowed to change Lil's status.")
+    def get(self, guild_id, user_id):
+        member = self.members.get((guild_id, user_id))
+        if member is not None:
+            self.members.move_to_end((guild_id, user_id))
+        return member
+
+    def put(self, member):
+        if self.size <= 0 or not isinstance(member, discord.Member):
             return
+        key = (member.guild.id, member.id)
+        self.members[key] = member
+        self.members.move_to_end(key)
+        while len(self.members) > self.size:
+            self.members.popitem(last=False)
+
+    def forget_guild(self, guild_id):
+        for key in [k for k in self.members if k[0] == guild_id]:
+            del self.members[key]
+
+    async def fetch(self, guild, user_id):
+        key = (guild.id, user_id)
+        task = self.inflight.get(key)
+        if task is None:
+            task = self.inflight[key] = asyncio.create_task(self._fetch(guild, user_id))
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, guild, user_id):
+        self.fetches += 1
+        try:
+            member = await guild.fetch_member(user_id)
+        except (discord.NotFound, discord.Forbidden):
+            return None
+        self.put(member)
+        return member
+
+member_lru = MemberLRU(MEMBER_LRU_SIZE if MEMBER_CACHE != "none" else 0)
+
+class LazyMember(commands.MemberConverter, app_commands.Transformer):
+    """Member converter that works without a chunked member cache.
+
+    Mentions are answered from the message payload, then the guild cache
+    (full mode) and the LRU, and only then with a single fetch_member.
+    Names still go through discord.py's MemberConverter. As a transformer
+    it backs the slash-command user option the same way.
+    """
+
+    @property
+    def type(self):
+        return discord.AppCommandOptionType.user
+
+    async def transform(self, interaction, value):
+        if isinstance(value, discord.Member) or interaction.guild is None:
+            return value
+        guild = interaction.guild
+        member = guild.get_member(value.id) or member_lru.get(guild.id, value.id)
+        if member is None:
+            member = await member_lru.fetch(guild, value.id)
+        if member is None:
+            raise app_commands.TransformerError(value, self.type, self)
+        return member
+
+    async def convert(self, ctx, argument):
+        match = MEMBER_ID_RE.match(argument)
+        if match is None or ctx.guild is None:
+            member = await super().convert(ctx, argument)
+            member_lru.put(member)
+            return member
+
+        user_id = int(match.group(1) or match.group(2))
+        member = (
+            discord.utils.get(ctx.message.mentions, id=user_id)
+            or ctx.guild.get_member(user_id)
+            or member_lru.get(ctx.guild.id, user_id)
+        )
+        if isinstance(member, discord.Member):
+            return member
+        member = await member_lru.fetch(ctx.guild, user_id)
+        if member is None:
+            raise commands.MemberNotFound(argument)
+        return member
 
-        lil_status = status
-        save_status(LIL_STATUS_FILE, lil_status)
-        await ctx.send(f"✅ Lil's status has been set to **{status}**!")
+@bot.event
+async def on_ready():
+    print(f"We are ready to log in, {bot.user.name}")
 
-@bot.command()
-async def sav(ctx, *, status: str = None):
-    global sav_status
-    ALLOWED_USER_ID = 734792664767266957  # Sav's ID
+@bot.event
+async def on_member_join(member):
+    member_lru.put(member)
+    welcome.member_joined(member)
 
-    if status is None:
-        if sav_status:
-            await ctx.send(f"😡 Sav is currently **{sav_status}**!")
-        else:
-            await ctx.send("Sav status has not been set yet.")
-    else:
-        if ctx.author.id != ALLOWED_USER_ID:
-            await ctx.send("❌ You are not allowed to change Sav's status.")
+@bot.event
+async def on_guild_remove(guild):
+    member_lru.forget_guild(guild.id)
+
+# ===== WELCOME PIPELINE =====
+WELCOME_DM_INTERVAL = 0.5    # seconds between welcome DMs, across all guilds
+WELCOME_QUEUE_MAX = 500      # joins waiting for a DM; overflow goes to the digest
+WELCOME_BURST_JOINS = 10     # joins per window that switch a guild to digest mode
+WELCOME_BURST_WINDOW = 60    # seconds
+WELCOME_DIGEST_DELAY = 30    # seconds of joins collected into one digest message
+WELCOME_DIGEST_NAMES = 40    # mentions listed in a digest before "and N more"
+
+class WelcomePipeline:
+    """Welcome DMs for new members, sent one at a time by a paced worker.
+
+    While a guild is seeing more than WELCOME_BURST_JOINS joins per
+    WELCOME_BURST_WINDOW (a raid or a big invite wave), its joins go into a
+    single digest message in the system channel instead of one DM each.
+    A DM that fails, usually because the member has DMs closed, is counted
+    and not retried; so is a digest with nowhere to go.
+    """
+
+    def __init__(self):
+        self.queue = asyncio.Queue(WELCOME_QUEUE_MAX)
+        self.joins = {}    # guild_id -> deque of recent join times
+        self.digests = {}  # guild_id -> members waiting for the next digest
+        self.worker = None
+        self.digest_tasks = set()  # strong refs, so pending digests can't be garbage-collected
+        self.sent = 0
+        self.closed_dms = 0
+        self.failed = 0
+        self.digested = 0
+        self.undelivered = 0  # digested joins that couldn't be posted
+
+    def start(self):
+        if self.worker is None or self.worker.done():
+            self.worker = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self.worker:
+            self.worker.cancel()
+        for task in self.digest_tasks:
+            task.cancel()
+
+    def member_joined(self, member):
+        self.joins.setdefault(member.guild.id, deque()).append(time.monotonic())
+        if self.bursting(member.guild.id):
+            self._add_to_digest(member)
+            return
+        try:
+            self.queue.put_nowait(member)
+        except asyncio.QueueFull:
+            self._add_to_digest(member)
+
+    def bursting(self, guild_id):
+        joins = self.joins.get(guild_id)
+        if not joins:
+            return False
+        cutoff = time.monotonic() - WELCOME_BURST_WINDOW
+        while joins and joins[0] < cutoff:
+            joins.popleft()
+        if not joins:
+            del self.joins[guild_id]
+        return len(joins) > WELCOME_BURST_JOINS
+
+    def _add_to_digest(self, member):
+        pending = self.digests.get(member.guild.id)
+        if pending is None:
+            pending = self.digests[member.guild.id] = []
+            task = asyncio.create_task(self._post_digest(member.guild))
+            self.digest_tasks.add(task)
+            task.add_done_callback(self.digest_tasks.discard)
+        pending.append(member)
+
+    async def _post_digest(self, guild):
+        await asyncio.sleep(WELCOME_DIGEST_DELAY)
+        members = self.digests.pop(guild.id, [])
+        if not members:
             return
+        channel = guild.system_channel
+        if channel is None:
+            self.undelivered += len(members)
+            log.warning("No system channel in %s for a welcome digest of %d members", guild.id, len(members))
+            return
+        names = ", ".join(m.mention for m in members[:WELCOME_DIGEST_NAMES])
+        if len(members) > WELCOME_DIGEST_NAMES:
+            names += f" and {len(members) - WELCOME_DIGEST_NAMES} more"
+        try:
+            # Listing is enough; pinging a whole raid wave is not.
+            await channel.send(f"👋 Welcome to the server {names}!", allowed_mentions=discord.AllowedMentions.none())
+        except discord.HTTPException as e:
+            self.undelivered += len(members)
+            log.warning("Failed to post welcome digest in %s: %s", guild.id, e)
+        else:
+            self.digested += len(members)
+
+    async def _run(self):
+        while True:
+            member = await self.queue.get()
+            # The guild may have started bursting while this join was queued.
+            if self.bursting(member.guild.id):
+                self._add_to_digest(member)
+                continue
+            try:
+                await member.send(f"Welcome to the server {member.name}")
+            except discord.Forbidden:
+                self.closed_dms += 1
+            except Exception as e:
+                # Connection errors end up here too; one bad send must not
+                # stop the worker, nothing would restart it.
+                self.failed += 1
+                log.warning("Failed to welcome %s: %s", member.id, e)
+            else:
+                self.sent += 1
+            await asyncio.sleep(WELCOME_DM_INTERVAL)
+
+welcome = WelcomePipeline()
+
+# ===== OUTBOUND SCHEDULER =====
+AUTO_REPLY_WINDOW = 2.0       # seconds an auto-reply waits to be merged with identical ones
+AUTO_REPLY_BACKLOG = 5        # merged auto-replies queued per channel; more are dropped
+AUTO_REPLY_MAX_MENTIONS = 20  # people named in one merged auto-reply
+
+class ReplyGroup:
+    __slots__ = ("template", "mentions", "due")
+
+    def __init__(self, template, mention):
+        self.template = template
+        self.mentions = [mention]
+        self.due = time.monotonic() + AUTO_REPLY_WINDOW
+
+    def render(self):
+        return self.template.replace("{mention}", ", ".join(self.mentions))
+
+class ChannelOutbox:
+    def __init__(self, channel):
+        self.channel = channel
+        self.priority = deque()      # (send factory, future) for command replies
+        self.groups = OrderedDict()  # rule id -> ReplyGroup
+        self.wakeup = asyncio.Event()
+        self.worker = None
+
+class OutboundScheduler:
+    """Orders what the bot sends into each channel.
+
+    Each active channel has one worker, so the bot's sends there share the
+    channel's rate-limit bucket in a deliberate order: command replies
+    first, then auto-replies. An auto-reply waits AUTO_REPLY_WINDOW seconds
+    and the same rule firing again in the meantime is folded into it,
+    naming everyone. At most AUTO_REPLY_BACKLOG auto-replies wait per
+    channel; new ones past that are dropped. Command replies are never
+    dropped.
+    """
+
+    def __init__(self):
+        self.outboxes = {}
+
+    def _outbox(self, channel):
+        box = self.outboxes.get(channel.id)
+        if box is None:
+            box = self.outboxes[channel.id] = ChannelOutbox(channel)
+        if box.worker is None or box.worker.done():
+            box.worker = asyncio.create_task(self._drain(box))
+        return box
+
+    async def send(self, channel, factory):
+        """Run `factory()` (a coroutine function doing the send) in the channel's priority lane."""
+        box = self._outbox(channel)
+        future = asyncio.get_running_loop().create_future()
+        box.priority.append((factory, future))
+        box.wakeup.set()
+        return await future
+
+    def auto_reply(self, channel, key, template, mention):
+        box = self._outbox(channel)
+        group = box.groups.get(key)
+        if group is None:
+            if len(box.groups) >= AUTO_REPLY_BACKLOG:
+                metrics.inc("lil_auto_replies_total", outcome="dropped")
+                return
+            box.groups[key] = ReplyGroup(template, mention)
+            box.wakeup.set()
+        elif mention in group.mentions or "{mention}" not in template:
+            metrics.inc("lil_auto_replies_total", outcome="coalesced")
+        elif len(group.mentions) >= AUTO_REPLY_MAX_MENTIONS:
+            metrics.inc("lil_auto_replies_total", outcome="dropped")
+        else:
+            group.mentions.append(mention)
+            metrics.inc("lil_auto_replies_total", outcome="coalesced")
 
-        sav_status = status
-        save_status(SAV_STATUS_FILE, sav_status)
-        await ctx.send(f"✅ Sav's status has been set to **{status}**!")
+    async def _drain(self, box):
+        try:
+            while True:
+                if box.priority:
+                    # Left queued until settled, so `finally` can fail it too.
+                    factory, future = box.priority[0]
+                    try:
+                        result = await factory()
+                    except Exception as e:
+                        if not future.done():
+                            future.set_exception(e)
+                    else:
+                        if not future.done():
+                            future.set_result(result)
+                    box.priority.popleft()
+                    continue
+
+                if not box.groups:
+                    return
+                key, group = next(iter(box.groups.items()))
+                delay = group.due - time.monotonic()
+                if delay > 0:
+                    # Sleep until the oldest auto-reply is due, or a command reply arrives.
+                    box.wakeup.clear()
+                    try:
+                        await asyncio.wait_for(box.wakeup.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                del box.groups[key]
+                try:
+                    await box.channel.send(group.render())
+                except Exception as e:
+                    log.warning("Failed to send auto-reply in %s: %s", box.channel.id, e)
+                else:
+                    metrics.inc("lil_auto_replies_total", outcome="sent")
+        finally:
+            if self.outboxes.get(box.channel.id) is box:
+                del self.outboxes[box.channel.id]
+            # Nothing else will run these; don't leave their senders waiting forever.
+            while box.priority:
+                _, future = box.priority.popleft()
+                if not future.done():
+                    future.cancel()
+
+outbox = OutboundScheduler()
+
+class LilContext(commands.Context):
+    async def send(self, *args, **kwargs):
+        # Slash replies go through the interaction, not the channel bucket.
+        if self.interaction is not None:
+            return await super().send(*args, **kwargs)
+        return await outbox.send(self.channel, functools.partial(super().send, *args, **kwargs))
+
+# ===== AUTO-REPLY RULES =====
+DEFAULT_RULES = [
+    Rule("morning", ("goodmorning", "good morning"), "reply", "Good morning, {mention}! ☀️"),
+    Rule("night", ("goodnight", "good night"), "reply", "Good night, {mention}! 🌙"),
+    Rule("hello", ("hello",), "reply", "Hello there, {mention}! 👋"),
+    Rule("zee", ("zee",), "delete", "{mention} - wag mo banggitin yan!"),
+]
+
+def load_keyword_rules(db):
+    return db.execute("SELECT id, guild_id, trigger, action, response FROM keyword_rules ORDER BY id").fetchall()
+
+def insert_keyword_rule(db, guild_id, trigger, action, response):
+    with db:
+        cur = db.execute(
+            "INSERT INTO keyword_rules (guild_id, trigger, action, response) VALUES (?, ?, ?, ?)",
+            (guild_id, trigger, action, response),
+        )
+    return cur.lastrowid
+
+def delete_keyword_rule(db, guild_id, rule_id):
+    with db:
+        cur = db.execute("DELETE FROM keyword_rules WHERE id = ? AND guild_id = ?", (rule_id, guild_id))
+    return cur.rowcount > 0
+
+class RuleBook:
+    """Default rules plus per-guild rules, each compiled into one engine."""
+
+    def __init__(self, defaults):
+        self.defaults = defaults
+        self.guild_rules = {}  # guild_id -> [Rule]
+        self._engines = {}
+
+    async def load(self):
+        self.guild_rules = {}
+        for rule_id, guild_id, trigger, action, response in await db_call(load_keyword_rules):
+            self.guild_rules.setdefault(guild_id, []).append(Rule(rule_id, (trigger,), action, response))
+        self._engines.clear()
+
+    def engine(self, guild_id):
+        # Guilds without custom rules all share the default engine.
+        key = guild_id if guild_id in self.guild_rules else None
+        engine = self._engines.get(key)
+        if engine is None:
+            # Guild rules go first so a custom reply wins over a default one.
+            engine = self._engines[key] = KeywordEngine(self.guild_rules.get(key, []) + self.defaults)
+        return engine
+
+    def rules(self, guild_id):
+        return self.engine(guild_id).rules
+
+    async def add(self, guild_id, trigger, action, response):
+        rule = Rule(None, (trigger,), action, response)  # validates before we store it
+        rule.id = await db_call(insert_keyword_rule, guild_id, rule.triggers[0], action, response)
+        self.guild_rules.setdefault(guild_id, []).append(rule)
+        self._engines.pop(guild_id, None)
+        return rule
+
+    async def remove(self, guild_id, rule_id):
+        if not await db_call(delete_keyword_rule, guild_id, rule_id):
+            return False
+        rules = [r for r in self.guild_rules.get(guild_id, []) if r.id != rule_id]
+        if rules:
+            self.guild_rules[guild_id] = rules
+        else:
+            self.guild_rules.pop(guild_id, None)
+        self._engines.pop(guild_id, None)
+        return True
 
-@bot.command()
-async def yuks(ctx, *, status: str = None):
-    global yuks_status
-    ALLOWED_USER_ID = 1280132085616738387  # Yuks' ID
+rule_book = RuleBook(DEFAULT_RULES)
 
-    if status is None:
-        if yuks_status:
-            await ctx.send(f"😏 Yuks is currently **{yuks_status}**!")
-        else:
-            await ctx.send("Yuks status has not been set yet.")
-    else:
-        if ctx.author.id != ALLOWED_USER_ID:
-            await ctx.send("❌ You are not allowed to change Yuks' status.")
-            return
+async def apply_keyword_rules(message):
+    guild_id = message.guild.id if message.guild else None
+    rules = rule_book.engine(guild_id).match(message.content)
+    if not rules:
+        return
 
-        yuks_status = status
-        save_status(YUKS_STATUS_FILE, yuks_status)
-        await ctx.send(f"✅ Yuks' status has been set to **{status}**!")
+    mention = message.author.mention
+    replied = deleted = False
+    for rule in rules:
+        if rule.action == "reply":
+            # Like the old if/elif chain, only the first matching reply is sent.
+            if not replied and rule.response:
+                replied = True
+                outbox.auto_reply(message.channel, rule.id, rule.response, mention)
+        elif rule.action == "delete":
+            if not deleted:
+                deleted = True
+                try:
+                    await message.delete()
+                except (discord.NotFound, discord.Forbidden):
+                    pass
+            if rule.response:
+                outbox.auto_reply(message.channel, rule.id, rule.response, mention)
+        elif rule.action == "react" and not deleted and rule.response:
+            try:
+                await message.add_reaction(rule.response)
+            except discord.HTTPException:
+                pass
 
+@bot.event
+async def on_message(message):
+    if message.author == bot.user:
+        return
 
-@bot.command()
+    if MEMBER_CACHE == "recent":
+        member_lru.put(message.author)
+    await apply_keyword_rules(message)
+    await bot.process_commands(message)
+
+@bot.hybrid_group(invoke_without_command=True, fallback="list")
+@commands.guild_only()
+async def autoreply(ctx):
+    """List this server's auto-reply rules."""
+    lines = []
+    for rule in rule_book.rules(ctx.guild.id):
+        triggers = ", ".join(f"`{t}`" for t in rule.triggers)
+        response = f" → {rule.response}" if rule.response else ""
+        lines.append(f"**{rule.id}** [{rule.action}] {triggers}{response}")
+    await ctx.send("\n".join(lines) or "No auto-reply rules.")
+
+@autoreply.command(name="add")
+@commands.guild_only()
+@commands.has_permissions(manage_guild=True)
+async def autoreply_add(ctx, action: str, trigger: str, *, response: str = None):
+    """!autoreply add <reply|delete|react> "<trigger>" [response, {mention} allowed]"""
+    action = action.lower()
+    if action not in ACTIONS:
+        await ctx.send(f"❌ Action must be one of: {', '.join(ACTIONS)}.")
+        return
+    if action in ("reply", "react") and not response:
+        await ctx.send(f"❌ A {action} rule needs a response.")
+        return
+    try:
+        rule = await rule_book.add(ctx.guild.id, trigger, action, response)
+    except ValueError as e:
+        await ctx.send(f"❌ {e}")
+        return
+    await ctx.send(f"✅ Added auto-reply rule **{rule.id}** for `{rule.triggers[0]}`.")
+
+@autoreply.command(name="remove")
+@commands.guild_only()
+@commands.has_permissions(manage_guild=True)
+async def autoreply_remove(ctx, rule_id: int):
+    if await rule_book.remove(ctx.guild.id, rule_id):
+        await ctx.send(f"🗑️ Removed auto-reply rule **{rule_id}**.")
+    else:
+        await ctx.send("❌ No such rule in this server (default rules can't be removed).")
+
+@bot.hybrid_command()
+async def hello(ctx):
+    await ctx.send(f"Hello {ctx.author.mention}!")
+
+@bot.hybrid_command()
 async def tiktok(ctx):
     await ctx.send(f"https://www.tiktok.com/@shanghaispicy {ctx.author.mention}!")
 
-@bot.command()
+@bot.hybrid_command()
 async def rank(ctx):
     await ctx.send(f"Radiant {ctx.author.mention}!")
 
-@bot.command()
+@bot.hybrid_command()
 async def aiz(ctx):
     await ctx.send(f"soft spoken clove main yan hehe sarap {ctx.author.mention}!")
 
-@bot.command()
+@bot.hybrid_command()
 async def tsukki(ctx):
     await ctx.send(f"yearner na clove main yan hehe {ctx.author.mention}!")
 
-@bot.command()
-async def valorant(ctx):
-    role = discord.utils.get(ctx.guild.roles, name=valorant_role)
-    if role:
-        await ctx.author.add_roles(role)
-        await ctx.send(f"{ctx.author.mention} is now assigned to {valorant_role}!")
-    else:
-        await ctx.send("Role doesn't exist")
-
-@bot.command()
-async def tft(ctx):
-    role = discord.utils.get(ctx.guild.roles, name=tft_role)
-    if role:
-        await ctx.author.add_roles(role)
-        await ctx.send(f"{ctx.author.mention} is now assigned to {tft_role}!")
-    else:
-        await ctx.send("Role doesn't exist")
-
-@bot.command()
-async def lol(ctx):
-    role = discord.utils.get(ctx.guild.roles, name=lol_role)
-    if role:
-        await ctx.author.add_roles(role)
-        await ctx.send(f"{ctx.author.mention} is now assigned to {lol_role}!")
-    else:
-        await ctx.send("Role doesn't exist")
-
-@bot.command()
+@bot.hybrid_command()
 async def lilcommands(ctx):
     await ctx.reply("!hello, !lil, !sav, !yuks, !tiktok, !rank, !aiz")
 
-@bot.command()
-async def poll(ctx, *, question):
-    target_channel_id = 1407904625969074216
-    target_channel = bot.get_channel(target_channel_id)
-
-    if not target_channel:
-        await ctx.send("❌ Couldn't find the target poll channel.")
-        return
-
+# ===== VOTE TALLIES =====
+POLL_DURATION = 60 * 60      # seconds before a !poll closes
+WYR_DURATION = 15 * 60       # seconds before a !wyr closes
+CLOSED_TALLIES_KEPT = 200    # finished polls still answerable by !pollresults
+
+class Tally:
+    """Vote counts for one message, fed by raw reaction events.
+
+    Each user counts once, for the most recent option they still have a
+    reaction on; `reacted` keeps their option indexes in reaction order.
+    """
+
+    __slots__ = ("title", "guild_id", "channel_id", "message_id", "options", "labels",
+                 "counts", "reacted", "closes_at", "closed")
+
+    def __init__(self, title, guild_id, channel_id, message_id, options, duration):
+        self.title = title
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.options = {emoji: i for i, (emoji, _) in enumerate(options)}
+        self.labels = [f"{emoji} {label}" for emoji, label in options]
+        self.counts = [0] * len(options)
+        self.reacted = {}
+        self.closes_at = time.time() + duration
+        self.closed = False
+
+    def add(self, user_id, emoji):
+        index = self.options.get(emoji)
+        if index is None or self.closed:
+            return
+        picks = self.reacted.setdefault(user_id, [])
+        if index in picks:
+            return
+        if picks:
+            self.counts[picks[-1]] -= 1
+        picks.append(index)
+        self.counts[index] += 1
+
+    def remove(self, user_id, emoji):
+        index = self.options.get(emoji)
+        picks = self.reacted.get(user_id)
+        if index is None or self.closed or not picks or index not in picks:
+            return
+        if picks[-1] == index:
+            self.counts[index] -= 1
+            picks.pop()
+            if picks:
+                self.counts[picks[-1]] += 1
+        else:
+            picks.remove(index)
+        if not picks:
+            del self.reacted[user_id]
+
+tallies = {}           # message_id -> Tally (open ones plus recently closed)
+latest_tally = {}      # guild_id -> message_id of the newest poll/wyr
+
+def track_tally(tally):
+    tallies[tally.message_id] = tally
+    latest_tally[tally.guild_id] = tally.message_id
+    if not close_expired_tallies.is_running():
+        close_expired_tallies.start()
+
+def tally_embed(tally):
+    total = sum(tally.counts)
+    lines = []
+    for label, count in zip(tally.labels, tally.counts):
+        share = count / total if total else 0
+        bar = "█" * round(share * 10) + "░" * (10 - round(share * 10))
+        lines.append(f"{label}\n`{bar}` **{count}** ({share:.0%})")
+
+    status = "🔒 Final results" if tally.closed else "🗳️ Voting open"
     embed = discord.Embed(
-        title="📢 **THOUGHTS NI LIL – CAST YOUR VOTE!**",
-        description=(
-            f"**⬇️ QUESTION:**\n"
-            f"__{question}__\n\n"
-            f"👍 = Agree\n"
-            f"👎 = Disagree\n"
-            f"🤔 = Neutral / Thinking\n\n"
-            f"🗳️ React below to vote!"
-        ),
-        color=random.choice([
-            discord.Color.green(),
-            discord.Color.blue(),
-            discord.Color.purple(),
-            discord.Color.gold()
-        ]),
-        timestamp=ctx.message.created_at
+        title=f"📊 {tally.title}",
+        description="\n\n".join(lines) + f"\n\n{status} • {total} vote(s)",
+        color=discord.Color.gold() if tally.closed else discord.Color.blue(),
     )
+    if not tally.closed:
+        embed.set_footer(text="Closes at")
+        embed.timestamp = datetime.datetime.fromtimestamp(tally.closes_at, datetime.timezone.utc)
+    return embed
 
-    embed.set_thumbnail(url="https://i.pinimg.com/736x/5c/dd/8d/5cdd8d89ce9d32e38f97c50ccece9933.jpg")
-    embed.set_footer(
-        text="📝 Powered by Lil bot • Made by aiz",
-        icon_url=ctx.guild.icon.url if ctx.guild.icon else discord.Embed.Empty
-    )
+@bot.event
+async def on_raw_reaction_add(payload):
+    tally = tallies.get(payload.message_id)
+    if tally and payload.user_id != bot.user.id:
+        tally.add(payload.user_id, str(payload.emoji))
 
-    poll_message = await target_channel.send(embed=embed)
-    await poll_message.add_reaction("👍")
-    await poll_message.add_reaction("👎")
-    await poll_message.add_reaction("🤔")
+@bot.event
+async def on_raw_reaction_remove(payload):
+    tally = tallies.get(payload.message_id)
+    if tally and payload.user_id != bot.user.id:
+        tally.remove(payload.user_id, str(payload.emoji))
+
+@tasks.loop(seconds=30)
+async def close_expired_tallies():
+    now = time.time()
+    for tally in [t for t in tallies.values() if not t.closed and t.closes_at <= now]:
+        tally.closed = True
+        channel = bot.get_partial_messageable(tally.channel_id, guild_id=tally.guild_id)
+        try:
+            await channel.send(
+                embed=tally_embed(tally),
+                reference=channel.get_partial_message(tally.message_id),
+                mention_author=False,
+            )
+        except discord.HTTPException as e:
+            log.warning("Failed to post results for %s: %s", tally.message_id, e)
 
-    await ctx.send(f"✅ Your poll has been posted in {target_channel.mention}!")
+    closed = [mid for mid, t in tallies.items() if t.closed]
+    for message_id in closed[:max(0, len(closed) - CLOSED_TALLIES_KEPT)]:
+        del tallies[message_id]
 
+    if not any(not t.closed for t in tallies.values()):
+        close_expired_tallies.stop()
 
-@bot.command()
+@close_expired_tallies.before_loop
+async def before_close_expired_tallies():
+    await bot.wait_until_ready()
+
+@bot.hybrid_command()
 async def tiktoklive(ctx):
     target_channel_id = 1413683705876316241
     channel = bot.get_channel(target_channel_id)
@@ -299,7 +1347,7 @@ async def tiktoklive(ctx):
 
         embed.set_footer(
             text="🔗 Powered by Lil bot • Brought to you by aiz",
-            icon_url=ctx.guild.icon.url if ctx.guild.icon else discord.Embed.Empty
+            icon_url=ctx.guild.icon.url if ctx.guild.icon else None
         )
 
         await channel.send(content="@everyone", embed=embed)
@@ -307,312 +1355,234 @@ async def tiktoklive(ctx):
     else:
         await ctx.send("❌ Could not find the live announcement channel.")
 
-@bot.command()
-async def kiss(ctx, member: discord.Member = None):
-    if not member:
-        await ctx.send("You need to mention someone to kiss! 😳")
-        return
-    if member == ctx.author:
-        await ctx.send("Awww, self-love is important! 😘")
-        return
-    gif = await fetch_giphy_gif("anime kiss")
-    if not gif:
-        await ctx.send("Couldn't fetch a kiss GIF right now, try again later!")
-        return
-    embed = discord.Embed(description=f"💋 {ctx.author.mention} kisses {member.mention}!", color=discord.Color.pink())
-    embed.set_image(url=gif)
-    await ctx.send(embed=embed)
 
+# ===== SLASH COMMANDS =====
 @bot.command()
-async def slap(ctx, member: discord.Member = None):
-    if not member:
-        await ctx.send("Mention someone to slap! 😡")
-        return
-    if member == ctx.author:
-        await ctx.send("Why are you slapping yourself? 😢")
-        return
-    gif = await fetch_giphy_gif("anime slap")
-    if not gif:
-        await ctx.send("Couldn't fetch a slap GIF right now, try again later!")
-        return
-    embed = discord.Embed(description=f"👋 {ctx.author.mention} slaps {member.mention}!", color=discord.Color.red())
-    embed.set_image(url=gif)
-    await ctx.send(embed=embed)
+@commands.is_owner()
+async def sync(ctx, scope: str = "global"):
+    """Register the slash versions of the commands with Discord.
+
+    `!sync guild` copies them to this server only, which shows up instantly;
+    a global sync can take a while to reach every client. Only needed after
+    commands are added, removed or change signature.
+    """
+    # Lazy extensions' slash commands are only in the tree once loaded.
+    for name in bot.enabled_extensions:
+        await bot.load_lazy(name)
+    if scope == "guild" and ctx.guild:
+        bot.synced_guilds.add(ctx.guild.id)
+        bot.tree.copy_global_to(guild=ctx.guild)
+        synced = await bot.tree.sync(guild=ctx.guild)
+    else:
+        synced = await bot.tree.sync()
+    await ctx.send(f"✅ Synced {len(synced)} slash commands ({scope}).")
 
 @bot.command()
-async def hug(ctx, member: discord.Member = None):
-    if not member:
-        await ctx.send("You gotta mention someone to hug! 🤗")
+@commands.is_owner()
+async def reload(ctx, extension: str = None):
+    """Reload an extension in place, e.g. `!reload gifs`; lists them without an argument.
+
+    In-memory caches of the extension start over; anything it keeps in
+    SQLite carries across. Only this worker process is affected.
+    """
+    if extension is None:
+        lines = []
+        for name in bot.enabled_extensions:
+            state = "loaded" if name in bot.extensions else "lazy" if name in bot.lazy_commands.values() else "not loaded"
+            lines.append(f"`{name.removeprefix('cogs.')}` – {state}")
+        await ctx.send("\n".join(lines) or "No extensions are enabled.")
         return
-    if member == ctx.author:
-        await ctx.send("Sending a virtual hug to yourself 🤗💖")
-        return
-    gif = await fetch_giphy_gif("anime hug")
-    if not gif:
-        await ctx.send("Couldn't fetch a hug GIF right now, try again later!")
-        return
-    embed = discord.Embed(description=f"🤗 {ctx.author.mention} gives {member.mention} a warm hug!", color=discord.Color.blue())
-    embed.set_image(url=gif)
-    await ctx.send(embed=embed)
 
-@bot.command()
-async def punch(ctx, member: discord.Member = None):
-    """Playful, non-graphic punch (like slap)."""
-    if not member:
-        await ctx.send("Mention someone to punch! (playfully) 🥊")
-        return
-    if member == ctx.author:
-        await ctx.send("Why are you punching yourself? Be kind to yourself! 🤕")
+    name = extension_name(extension)
+    if name not in bot.enabled_extensions:
+        await ctx.send(f"❌ `{extension}` isn't an enabled extension.")
         return
-    gif = await fetch_giphy_gif("anime punch")
-    if not gif:
-        await ctx.send("Couldn't fetch a punch GIF right now, try again later!")
+    started = time.perf_counter()
+    try:
+        if name in bot.extensions:
+            async with bot.extension_lock:
+                await bot.reload_extension(name)
+        else:
+            await bot.load_lazy(name)
+    except commands.ExtensionError as e:
+        log.error("Reloading %s failed", name, exc_info=e)
+        await ctx.send(f"❌ Couldn't load `{name}`: {e.__cause__ or e}")
         return
-    embed = discord.Embed(description=f"🥊 {ctx.author.mention} playfully punches {member.mention}!", color=discord.Color(0xE53935))
-    embed.set_image(url=gif)
-    await ctx.send(embed=embed)
+    bot.recopy_guild_commands()
+    await ctx.send(f"✅ Reloaded `{name}` in {(time.perf_counter() - started) * 1000:.0f}ms.")
 
-@bot.command()
-async def kill(ctx, member: discord.Member = None):
-    """Cute boop command — PG friendly."""
-    if not member:
-        await ctx.send("Who do you want to kill? Mention someone! 👀")
-        return
-    if member == ctx.author:
-        await ctx.send("Killing yourself? A+ self-harm. 🤗")
-        return
-    gif = await fetch_giphy_gif("kill anime")
-    if not gif:
-        await ctx.send("Couldn't fetch a kill GIF right now, try again later!")
-        return
-    embed = discord.Embed(description=f"👆 {ctx.author.mention} gives {member.mention} a finishing blow!", color=discord.Color.blue())
-    embed.set_image(url=gif)
-    await ctx.send(embed=embed)
+# ===== STATS =====
+def format_seconds(value):
+    if value is None:
+        return "–"
+    if math.isinf(value):
+        return f">{LATENCY_BUCKETS[-1]:g}s"
+    return f"{value * 1000:.0f}ms" if value < 1 else f"{value:g}s"
 
 @bot.command()
-async def vanish(ctx, member: discord.Member = None):
-    """Playful 'vanish' — harmless alternative to destructive commands."""
-    target_text = f" at {member.mention}" if member and member != ctx.author else ""
-    if member == ctx.author:
-        await ctx.send("You try to vanish... but you're still here. ✨")
-        return
-    gif = await fetch_giphy_gif("poof disappear anime")
-    if not gif:
-        await ctx.send(f"{ctx.author.mention} dramatically vanishes{target_text}... (but comes back soon).")
-        return
-    embed = discord.Embed(description=f"✨ {ctx.author.mention} dramatically vanishes{target_text}... (it's just a prank!)", color=discord.Color.purple())
-    embed.set_image(url=gif)
-    await ctx.send(embed=embed)
-
-@bot.command()
-async def wyr(ctx):
-    """Edgy Tagalog Would You Rather game"""
-    questions = [
-        # Life struggles
-        ("Mawala net mo habang ranked 🔌", "Mawala kuryente habang live ⚡"),
-        ("Maging single forever 💔", "Maging taken pero toxic 😬"),
-        ("Di ka na makakain ng Jollibee 🍗", "Di ka na makakain ng Mang Inasal 🍴"),
-        ("Maging pogi/ganda pero bobo 😅", "Maging matalino pero walang jowa 📖"),
-        ("Laging late pero pogi/ganda ⏰", "Laging on time pero baduy 😬"),
-        ("Maging mayaman pero pangit 💸", "Maging maganda/pogi pero broke 💔"),
-        ("Laging galet si sav 😡", "Laging clingy si aiz 🥴"),
-
-        # Gaming
-        ("Maging Radiant sa Valorant 🎯", "Maging Challenger sa LoL 🧙‍♂️"),
-        ("Magpuyat sa ML hanggang 6AM 📱", "Mag-all nighter sa thesis 📚"),
-        ("Magka-ace sa Valorant 💥", "Mag-pentakill sa LoL 🔥"),
-        ("Talo lagi sa ranked 😭", "AFK lagi teammate mo 😡"),
-
-        # School/Work
-        ("Walang kape habang exam ☕", "Walang tulog habang exam 😵"),
-        ("Mag-report sa harap ng class 📢", "Mag-sayaw sa TikTok sa harap ng lahat 💃"),
-        ("Maging cum laude pero walang friends 🎓", "Maging happy-go-lucky pero bagsak lagi 😅"),
-        ("Laging gutom sa school 🍜", "Laging broke sa school 💸"),
-
-        # Daily life
-        ("Sumakay ng jeep na siksikan 🚌", "Sumakay ng MRT na amoy pawis 🚇"),
-        ("Sumabay sa bagyo 🌪️", "Sumabay sa baha 🌊"),
-        ("Maglakad sa ulan 🌧️", "Maglakad sa init ng araw ☀️"),
-        ("Laging lowbat 🔋", "Laging walang load 📶"),
-
-        # Relationships / Spicy (but safe)
-        ("Maging loyal pero laging busy 📵", "Maging sweet pero seloso/selosa 😏"),
-        ("Makita ex mo araw-araw 👀", "Maging classmate ang ex mo buong semester 📚"),
-        ("Maging marupok 💔", "Maging manhid 🥶"),
-        ("Ghosted 👻", "Zinonezone ☝️"),
-    ]
-
-    option1, option2 = random.choice(questions)
-
-    embed = discord.Embed(
-        title="🤔 Would You Rather (Pinoy Edition)",
-        description=f"1️⃣ {option1}\n\n2️⃣ {option2}\n\nReact ka na!",
-        color=discord.Color.random(),
-        timestamp=ctx.message.created_at
+@commands.is_owner()
+async def stats(ctx):
+    """Owner-only summary of the metrics served on /metrics."""
+    embed = discord.Embed(title="📈 Lil bot stats", color=discord.Color.blurple())
+
+    commands_seen = {}
+    for (name, labels), hist in metrics.histograms.items():
+        if name == "lil_command_duration_seconds":
+            commands_seen.setdefault(dict(labels)["command"], []).append(hist)
+    lines = []
+    for command, hists in sorted(commands_seen.items()):
+        merged = Histogram()
+        for hist in hists:
+            merged.merge(hist)
+        lines.append(
+            f"`!{command}` ×{merged.count} • p50 {format_seconds(merged.quantile(0.5))}"
+            f" • p99 {format_seconds(merged.quantile(0.99))}"
+        )
+    embed.add_field(name="Commands", value="\n".join(lines[:20]) or "–", inline=False)
+
+    upstream = {}
+    for (name, labels), value in metrics.counters.items():
+        if name == "lil_upstream_requests_total":
+            labels = dict(labels)
+            upstream.setdefault(labels["host"], {})[labels["status"]] = value
+    lines = []
+    for host, statuses in sorted(upstream.items()):
+        hist = metrics.histograms.get(("lil_upstream_request_duration_seconds", (("host", host),)))
+        p99 = format_seconds(hist.quantile(0.99)) if hist else "–"
+        breakdown = ", ".join(f"{status}: {n}" for status, n in sorted(statuses.items()))
+        lines.append(f"`{host}` p99 {p99} • {breakdown}")
+    embed.add_field(name="Upstream", value="\n".join(lines) or "–", inline=False)
+
+    # Extensions add their own section by defining stats_field() on their cog.
+    for cog in bot.cogs.values():
+        if hasattr(cog, "stats_field"):
+            name, value = cog.stats_field()
+            embed.add_field(name=name, value=value, inline=False)
+
+    tick = metrics.histograms.get(("lil_live_tick_duration_seconds", ()))
+    ratelimits = metrics.counters.get(("lil_discord_ratelimit_hits_total", ()), 0)
+    embed.add_field(
+        name="Discord / loop",
+        value=(
+            f"Gateway latency: {format_seconds(bot.latency) if math.isfinite(bot.latency) else '–'}\n"
+            f"Loop lag: {loop_lag.lag * 1000:.1f}ms\n"
+            f"Rate-limit hits: {ratelimits}\n"
+            f"Live ticks: {tick.count if tick else 0} • p99 {format_seconds(tick.quantile(0.99) if tick else None)}"
+        ),
+        inline=False,
     )
-    embed.set_footer(text="📝 Powered by Lil bot • Edgy Tagalog WYR")
+    await ctx.send(embed=embed)
 
-    wyr_message = await ctx.send(embed=embed)
 
-    # Reactions for voting
-    await wyr_message.add_reaction("1️⃣")
-    await wyr_message.add_reaction("2️⃣")
-    
-@tasks.loop(seconds=60)
-async def update_live_matches():
-    if not live_match_messages:
-        return
-
-    url = "https://vlrggapi.vercel.app/match?q=live_score"
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(url, timeout=15) as resp:
-                if resp.status != 200:
-                    return
-                data = await resp.json()
-        except Exception as e:
-            print("Error fetching live matches:", e)
-            return
+# ===== PROFILER =====
+PROFILE_MAX_SECONDS = 60
+PROFILE_INTERVAL = 0.005  # ~200 samples/s
+
+profile_lock = asyncio.Lock()
+
+def sample_stacks(thread_id, seconds, interval=PROFILE_INTERVAL):
+    """Sample one thread's stack and count identical stacks (collapsed format)."""
+    labels = {}
+    counts = {}
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            label = labels.get(code)
+            if label is None:
+                name = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                label = labels[code] = name.replace(";", ":")
+            stack.append(label)
+            frame = frame.f_back
+        if stack:
+            key = ";".join(reversed(stack))
+            counts[key] = counts.get(key, 0) + 1
+        time.sleep(interval)
+    return counts
 
-    matches = data.get("data", {}).get("segments", []) or data.get("data", {}).get("matches", [])
-    if not matches:
+@bot.command()
+@commands.is_owner()
+async def profile(ctx, seconds: int = 10):
+    """Owner-only: sample the event loop and upload a flamegraph-ready stack file."""
+    seconds = max(1, min(seconds, PROFILE_MAX_SECONDS))
+    if profile_lock.locked():
+        await ctx.send("⏳ A profile is already running.")
         return
 
-    seg = matches[0]  # Top live match
+    async with profile_lock:
+        await ctx.send(f"⏱️ Sampling the event loop for {seconds}s...")
+        counts = await asyncio.to_thread(sample_stacks, threading.get_ident(), seconds)
 
-    t1 = seg.get("team1") or seg.get("team1_name") or "TBD"
-    t2 = seg.get("team2") or seg.get("team2_name") or "TBD"
-    s1 = seg.get("score1") or seg.get("team1_score") or seg.get("score_a")
-    s2 = seg.get("score2") or seg.get("team2_score") or seg.get("score_b")
-    event = seg.get("match_event") or seg.get("tournament_name") or "Unknown Event"
-    series = seg.get("match_series") or seg.get("round_info") or ""
-    logo1 = normalize_url(seg.get("team1_logo") or seg.get("flag1"))
-    logo2 = normalize_url(seg.get("team2_logo") or seg.get("flag2"))
-
-    embed = discord.Embed(
-        title=f"🏆 {event}",
-        description=f"**{series}**\n\n🔴 **LIVE NOW**",
-        color=discord.Color.red(),
-        timestamp=datetime.datetime.utcnow()
+    collapsed = "\n".join(f"{stack} {n}" for stack, n in sorted(counts.items(), key=lambda kv: -kv[1]))
+    file = discord.File(io.BytesIO(collapsed.encode("utf-8")), filename=f"profile-{int(time.time())}.collapsed")
+    await ctx.send(
+        f"🔥 {sum(counts.values())} samples, {len(counts)} unique stacks. "
+        "Open with speedscope or `flamegraph.pl`.",
+        file=file,
     )
 
-    # Logos
-    if logo1:
-        embed.set_thumbnail(url=logo1)  # left team
-    if logo2:
-        embed.set_author(name=t2, icon_url=logo2)  # right team
 
-    # Scoreboard
-    embed.add_field(
-        name="📊 Scoreboard",
-        value=f"🟥 **{t1}** `{s1}`  ⚔️  `{s2}` **{t2}` 🟦",
-        inline=False
-    )
-
-    # Maps info
-    if seg.get("maps"):
-        maps_info = []
-        for m in seg["maps"]:
-            map_name = m.get("map", "Unknown Map")
-            mscore = m.get("score", "–")
-            maps_info.append(f"• **{map_name}** → `{mscore}`")
-        embed.add_field(
-            name="🗺️ Maps",
-            value="\n".join(maps_info),
-            inline=False
-        )
+def resolve_shard_count():
+    if SHARD_COUNT != "auto":
+        return int(SHARD_COUNT)
 
-    embed.set_footer(text="Auto-updating every 60s • Data from vlr.gg API")
-
-    # Update all live match messages
-    for channel_id, msg in live_match_messages.items():
+    async def recommended():
+        http = discord.http.HTTPClient(asyncio.get_running_loop())
         try:
-            await msg.edit(embed=embed)
-        except Exception as e:
-            print(f"Failed to update live match message in {channel_id}: {e}")
-
-
-@bot.command()
-async def vct(ctx, mode: str = "upcoming"):
-    mode = mode.lower()
-
-    if mode == "live":
-        url = "https://vlrggapi.vercel.app/match?q=live_score"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=15) as resp:
-                if resp.status != 200:
-                    await ctx.send("⚠️ No live matches right now.")
-                    return
-                data = await resp.json()
-
-        matches = data.get("data", {}).get("segments", []) or data.get("data", {}).get("matches", [])
-        if not matches:
-            await ctx.send("ℹ️ No live matches at the moment.")
-            return
-
-        seg = matches[0]
-        t1 = seg.get("team1") or seg.get("team1_name") or "TBD"
-        t2 = seg.get("team2") or seg.get("team2_name") or "TBD"
-        s1 = seg.get("score1") or seg.get("team1_score") or seg.get("score_a") or 0
-        s2 = seg.get("score2") or seg.get("team2_score") or seg.get("score_b") or 0
-        event = seg.get("match_event") or seg.get("tournament_name") or "Unknown Event"
-        series = seg.get("match_series") or seg.get("round_info") or "BO3"
-        logo1 = normalize_url(seg.get("team1_logo") or seg.get("flag1"))
-        logo2 = normalize_url(seg.get("team2_logo") or seg.get("flag2"))
-
-        bans_picks = seg.get("bans_picks") or "No bans/picks info available."
-
-        embed = discord.Embed(
-            title=f"🏆 {event}",
-            description=f"**{series}** • 🔴 LIVE NOW",
-            color=discord.Color.red(),
-            timestamp=datetime.datetime.utcnow()
-        )
-
-        # Team logos
-        if logo1:
-            embed.set_thumbnail(url=logo1)  # Left team
-        if logo2:
-            embed.set_image(url=logo2)  # Right team (will show large image on the side)
-
-        # Scoreboard with VS in the middle
-        embed.add_field(
-            name=f"{t1} 🟥",
-            value=f"**{s1}**",
-            inline=True
+            await http.static_login(token)
+            shards, _, _ = await http.get_bot_gateway()
+            return shards
+        finally:
+            await http.close()
+
+    return asyncio.run(recommended())
+
+def run_workers():
+    """Split the shards over SHARD_PROCESSES child processes and wait on them."""
+    shard_count = resolve_shard_count()
+    processes = min(SHARD_PROCESSES, shard_count)
+    base_port = int(os.environ.get("PORT", 5000))
+    log_root, log_ext = os.path.splitext(LOG_FILE)
+
+    workers = []
+    for index in range(processes):
+        env = dict(
+            os.environ,
+            SHARD_COUNT=str(shard_count),
+            SHARD_PROCESSES=str(processes),
+            SHARD_IDS=",".join(str(i) for i in range(index, shard_count, processes)),
+            LIL_WORKER=str(index),
+            PORT=str(base_port + index if base_port else 0),
+            LOG_FILE=f"{log_root}.{index}{log_ext}",  # rotation isn't safe across processes
         )
-        embed.add_field(
-            name="⚔️ VS ⚔️",
-            value="—",
-            inline=True
-        )
-        embed.add_field(
-            name=f"🟦 {t2}",
-            value=f"**{s2}**",
-            inline=True
-        )
-
-        # Bans / Picks / Map info
-        if bans_picks:
-            embed.add_field(
-                name="🎮 Bans / Picks",
-                value=bans_picks,
-                inline=False
-            )
-
-        embed.set_footer(text="Auto-updating every 60s • Powered by vlr.gg")
-
-        msg = await ctx.send(embed=embed)
-        live_match_messages[ctx.channel.id] = msg
+        workers.append(subprocess.Popen([sys.executable, os.path.abspath(__file__)], env=env))
+        print(f"Started worker {index} (pid {workers[-1].pid}) for shards {env['SHARD_IDS']} of {shard_count}")
 
-        if not update_live_matches.is_running():
-            update_live_matches.start()
-
-    else:
-        await ctx.send("⚠️ Use `!vct live` for live match tracking.")
+    try:
+        for worker in workers:
+            worker.wait()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.wait()
+
+def run_bot():
+    if SHARD_COUNT is not None and SHARD_PROCESSES > 1 and WORKER_INDEX is None:
+        run_workers()
+        return
 
+    log_listener = setup_logging()
+    try:
+        # Logging is already configured above, so discord.py must not add its own handler.
+        bot.run(token, log_handler=None)
+    finally:
+        log_listener.stop()
 
-bot.run(token, log_handler=handler, log_level=logging.INFO)
+if __name__ == "__main__":
+    run_bot()
 
 
 